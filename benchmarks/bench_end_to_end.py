@@ -0,0 +1,181 @@
+# Μέτρηση από άκρη σε άκρη: UploadEngine (Playwright, headless) απέναντι στο τοπικό mock της πύλης
+#
+#   python benchmarks/bench_end_to_end.py [πλήθος γραμμών ...] [--workers 3] [--pipeline] [--assets cache]
+#                                         [--latency-ms 150] [--fail-rate 0.02] [--mode save|submit]
+#
+# Για κάθε μέγεθος: συνθετικό Excel + μικρά PDF, εκτέλεση, και αναφορά γραμμών/λεπτό, αποτυχιών,
+# νέων προσπαθειών, p50/p95 ανά φάση (από το logs/run_*.jsonl) και μέγιστης μνήμης.
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_portal import MockPortal, synthetic_catalog, DOC_TYPES
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+PHASES = ("open_form", "dropdown_beneficiary", "dropdown_project", "dropdown_document",
+          "date_issue", "date_expiry", "file_upload", "save_toast", "submit", "return", "row")
+# Ελάχιστο έγκυρο PDF (ο έλεγχος περιεχομένου κοιτά τα πρώτα bytes)
+TINY_PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+
+def synthetic_workbook(catalog, rows, directory, seed=1):
+    # Γραμμές για δικαιούχους/έργα που υπάρχουν στο mock, με ένα αρχείο ανά γραμμή
+    rng = random.Random(seed)
+    today = datetime.now()
+    files = os.path.join(directory, "docs")
+    os.makedirs(files, exist_ok=True)
+    data = []
+    for i in range(rows):
+        company = rng.choice(catalog)
+        name = f"doc_{rows}_{i:06d}"  # μοναδικά ανά μέγεθος: το mock κρατά τα έγγραφα όλων των εκτελέσεων
+        with open(os.path.join(files, name + ".pdf"), "wb") as f:
+            f.write(TINY_PDF + f"% {i}\n".encode())
+        data.append({
+            "Επωνυμία – ΑΦΜ": company["ben"],
+            "Κωδικός έργου": rng.choice(company["projects"]),
+            "Κωδικός Δικαιολογητικού": rng.choice(DOC_TYPES)[0],
+            "Όνομα αρχείου": name,
+            "Ημερομηνία έκδοσης δικαιολογητικού": (today - timedelta(days=rng.randint(1, 700))).strftime("%Y-%m-%d"),
+            "Ημερομηνία λήξης δικαιολογητικού": (today + timedelta(days=rng.randint(1, 1800))).strftime("%Y-%m-%d"),
+            "Παρατηρήσεις ΟΠΣΚΕ": f"Δοκιμή {i}" if i % 3 == 0 else "",
+        })
+    excel = os.path.join(directory, f"bench_{rows}.xlsx")
+    pd.DataFrame(data).to_excel(excel, index=False)
+    return excel, files
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def phase_stats(path):
+    phases = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            phases.setdefault(entry["phase"], []).append(entry["ms"])
+    return phases
+
+
+def peak_rss_mb():
+    # ru_maxrss σε KB στο Linux, σε bytes στο macOS· τα παιδιά (Chromium) μετρούν μόνο αφού τερματίσουν
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own / 2**20, children / 2**20
+
+
+def run_size(core, portal, catalog, rows, args, workdir):
+    excel, files = synthetic_workbook(catalog, rows, workdir)
+    before = portal.stats()
+    engine = core.UploadEngine(excel, files, workers=args.workers, pacing="benchmark", headless=True,
+                               retries=args.retries, assets=args.assets, pipeline=args.pipeline)
+    # Η ταχύτητα μετρά μόνο τις επιτυχημένες γραμμές: οι γρήγορες αποτυχίες δεν πρέπει να την ανεβάζουν
+    events = {"ok": 0, "result": 0}
+
+    def count(kind, data):
+        if kind == "result":
+            events["result"] += 1
+            events["ok"] += data["ok"]
+    engine.subscribe(count)
+    if not engine.check():
+        raise SystemExit(f"Ο έλεγχος απέτυχε για {rows} γραμμές")
+    start = time.perf_counter()
+    engine.execute(submit=args.mode == "submit")
+    elapsed = time.perf_counter() - start
+    after = portal.stats()
+    own, children = peak_rss_mb()
+    return {
+        "rows": rows, "seconds": elapsed, "rows_per_min": events["ok"] / elapsed * 60 if elapsed else 0.0,
+        "attempted_per_min": events["result"] / elapsed * 60 if elapsed else 0.0,
+        "failed": len(engine.failed_rows()), "retries": getattr(engine, "retry_count", 0),
+        "saved": after["saved"] - before["saved"], "submitted": after["submitted"] - before["submitted"],
+        "injected": after["injected_failures"] - before["injected_failures"],
+        "rss_mb": own, "browser_rss_mb": children,
+        "phases": phase_stats(engine.profiler.path),
+    }
+
+
+def report(result):
+    print(f"\n=== {result['rows']} γραμμές: {result['seconds']:.1f}s, {result['rows_per_min']:.1f} επιτυχημένες γραμμές/λεπτό "
+          f"({result['attempted_per_min']:.1f} μαζί με τις αποτυχίες) ===")
+    print(f"αποθηκεύτηκαν {result['saved']}, υποβλήθηκαν {result['submitted']}, αποτυχίες {result['failed']}, "
+          f"νέες προσπάθειες {result['retries']}, σφάλματα mock {result['injected']}")
+    print(f"μέγιστη μνήμη: python {result['rss_mb']:.0f} MB, browser {result['browser_rss_mb']:.0f} MB")
+    print(f"{'φάση':<22} {'πλήθος':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    phases = result["phases"]
+    for phase in PHASES + tuple(sorted(set(phases) - set(PHASES))):
+        values = phases.get(phase)
+        if values:
+            print(f"{phase:<22} {len(values):>7} {percentile(values, 0.5):>9.0f} {percentile(values, 0.95):>9.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Μέτρηση UploadEngine απέναντι στο mock της πύλης ΟΠΣΚΕ")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pipeline", action="store_true")
+    parser.add_argument("--assets", choices=("off", "block", "cache"), default="off")
+    parser.add_argument("--mode", choices=("save", "submit"), default="save")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--page-latency-ms", type=int, default=300)
+    parser.add_argument("--asset-latency-ms", type=int, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="αποθήκευση αποτελεσμάτων σε αρχείο JSON")
+    args = parser.parse_args(argv)
+
+    catalog = synthetic_catalog(args.companies)
+    portal = MockPortal(catalog, args.latency_ms, args.page_latency_ms, args.asset_latency_ms, args.fail_rate)
+    base_url = portal.start()
+    workdir = tempfile.mkdtemp(prefix="opske_bench_")
+
+    # Το opske_core διαβάζει αυτές τις ρυθμίσεις κατά το import: συνεδρία, logs και αποδεικτικά
+    # μένουν στον φάκελο της μέτρησης και η πραγματική πύλη δεν αγγίζεται ποτέ
+    if "opske_core" in sys.modules:
+        portal.stop()
+        raise SystemExit("Το opske_core φορτώθηκε πριν οριστούν τα OPSKE_* - η μέτρηση θα χτυπούσε την πραγματική πύλη")
+    os.environ["OPSKE_BASE_URL"] = base_url
+    os.environ["OPSKE_STATE_PATH"] = os.path.join(workdir, "auth_state.json")
+    os.environ["OPSKE_LOG_DIR"] = os.path.join(workdir, "logs")
+    os.environ["OPSKE_SCREEN_DIR"] = os.path.join(workdir, "screenshots")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import opske_core as core
+    assert core.BASE_URL == base_url and core.SCREEN_DIR == os.environ["OPSKE_SCREEN_DIR"]
+
+    print(f"Mock ΟΠΣΚΕ: {base_url} | workers={args.workers} pipeline={args.pipeline} assets={args.assets} "
+          f"latency={args.latency_ms}ms fail_rate={args.fail_rate}")
+    results = []
+    try:
+        for rows in args.sizes:
+            size_dir = os.path.join(workdir, str(rows))
+            os.makedirs(size_dir, exist_ok=True)
+            result = run_size(core, portal, catalog, rows, args, size_dir)
+            report(result)
+            results.append(result)
+    finally:
+        portal.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in r.items() if k != "phases"} | {
+                "phases": {p: {"n": len(v), "p50": percentile(v, 0.5), "p95": percentile(v, 0.95)}
+                           for p, v in r["phases"].items()}} for r in results], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+# Τοπικό υποκατάστατο της πύλης ΟΠΣΚΕ για μετρήσεις και δοκιμές χωρίς την πραγματική πύλη
+#
+#   python benchmarks/mock_portal.py [--port 8765] [--latency-ms 150] [--fail-rate 0.02]
+#   OPSKE_BASE_URL=http://127.0.0.1:8765 python opske_core.py --excel ... --folder ...
+#
+# Μιμείται: login ΑΑΔΕ, λίστα δικαιολογητικών με σελιδοποίηση, φόρμα με PrimeNG-όμοια
+# dropdown/multiselect/datepicker, upload αρχείου, toast αποθήκευσης και κουμπί Υποβολής.
+import os
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Ίδιο με opske_core.LIST_PATH (το opske_core διαβάζει το OPSKE_BASE_URL κατά το import)
+LIST_PATH = "/dashboard/invoices/supporting-document/my-supporting-document"
+FORM_PATH = LIST_PATH + "/new"
+PAGE_SIZE = 50
+
+FIRST_WORDS = ["ΑΛΦΑ", "ΒΗΤΑ", "ΓΑΜΜΑ", "ΔΕΛΤΑ", "ΕΨΙΛΟΝ", "ΖΗΤΑ", "ΘΗΤΑ", "ΙΩΤΑ", "ΚΑΠΠΑ", "ΛΑΜΔΑ",
+               "ΟΜΙΚΡΟΝ", "ΣΙΓΜΑ", "ΤΑΥ", "ΥΨΙΛΟΝ", "ΦΙ", "ΧΙ", "ΨΙ", "ΩΜΕΓΑ", "ΑΡΓΩ", "ΗΛΙΟΣ"]
+SECOND_WORDS = ["ΤΕΧΝΙΚΗ", "ΕΜΠΟΡΙΚΗ", "ΤΟΥΡΙΣΤΙΚΗ", "ΑΓΡΟΤΙΚΗ", "ΒΙΟΜΗΧΑΝΙΚΗ", "ΝΑΥΤΙΛΙΑΚΗ",
+                "ΚΑΤΑΣΚΕΥΑΣΤΙΚΗ", "ΣΥΜΒΟΥΛΕΥΤΙΚΗ", "ΕΝΕΡΓΕΙΑΚΗ", "ΨΗΦΙΑΚΗ"]
+DOC_TYPES = [("01.01", "Βεβαίωση έναρξης εργασιών"), ("01.03", "Φορολογική ενημερότητα"),
+             ("01.04", "Ασφαλιστική ενημερότητα"), ("02.01", "Καταστατικό"),
+             ("02.05", "Πιστοποιητικό ΓΕΜΗ"), ("03.02", "Άδεια λειτουργίας"),
+             ("04.01", "Τιμολόγιο προμηθευτή"), ("05.07", "Βεβαίωση μη πτώχευσης")]
+STATIC_SIZES = {"vendor.js": 600_000, "theme.css": 120_000, "primeicons.woff2": 80_000, "logo.png": 150_000}
+
+
+def make_afm(rng, valid=True):
+    # Χωρίς import του opske_core: ο harness ορίζει πρώτα τα OPSKE_* και μετά φορτώνει τον agent
+    digits = [rng.randint(0, 9) for _ in range(8)]
+    remainder = sum(d * w for d, w in zip(digits, [256, 128, 64, 32, 16, 8, 4, 2])) % 11
+    check = 0 if remainder == 10 else remainder
+    if not valid:
+        check = (check + 1) % 10
+    return "".join(map(str, digits)) + str(check)
+
+
+def synthetic_catalog(companies=50, projects=3, seed=1):
+    # Δικαιούχοι με μοναδικό (6 πρώτοι χαρακτήρες, 3 τελευταία ψηφία ΑΦΜ), όπως τους ψάχνει ο agent
+    rng = random.Random(seed)
+    catalog, seen, number = [], set(), 10_000
+    while len(catalog) < companies:
+        name = f"{rng.choice(FIRST_WORDS)} {rng.choice(SECOND_WORDS)} ΑΕ"
+        afm = make_afm(rng)
+        if (name[:6], afm[-3:]) in seen:
+            continue
+        seen.add((name[:6], afm[-3:]))
+        codes = []
+        for _ in range(projects):
+            number += rng.randint(1, 50)
+            codes.append(f"ΕΡΓΟ-{number}")
+        catalog.append({"ben": f"{name} - {afm}", "afm": afm, "projects": codes})
+    return catalog
+
+
+class MockPortal:
+    def __init__(self, catalog=None, latency_ms=150, page_latency_ms=300, asset_latency_ms=50,
+                 fail_rate=0.0, seed=1):
+        self.catalog = catalog or synthetic_catalog()
+        self.by_afm = {c["afm"]: c for c in self.catalog}
+        self.latency_ms = latency_ms
+        self.page_latency_ms = page_latency_ms
+        self.asset_latency_ms = asset_latency_ms
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.uploads = {}
+        self.documents = []
+        self.counters = {"requests": 0, "saved": 0, "submitted": 0, "injected_failures": 0, "upload_bytes": 0}
+        self.statics = {name: self.static_body(name, size) for name, size in STATIC_SIZES.items()}
+        self.server = None
+
+    # --- ρυθμίσεις συμπεριφοράς ---
+    def sleep(self, ms):
+        if ms:
+            with self.lock:
+                factor = self.rng.uniform(0.5, 1.5)
+            time.sleep(ms * factor / 1000)
+
+    def should_fail(self):
+        with self.lock:
+            failed = self.rng.random() < self.fail_rate
+            if failed:
+                self.counters["injected_failures"] += 1
+        return failed
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counters[key] += n
+
+    def static_body(self, name, size):
+        if name == "vendor.js":
+            line = "/* vendor bundle padding: angular, primeng, rxjs */\n"
+        elif name == "theme.css":
+            line = "/* primeng theme padding */\n"
+        else:
+            return os.urandom(size)
+        return (line * (size // len(line) + 1))[:size].encode()
+
+    # --- κατάσταση ---
+    def list_rows(self, page):
+        with self.lock:
+            docs = list(self.documents)
+        pages = max(1, -(-len(docs) // PAGE_SIZE))
+        chunk = docs[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        rows = [[d["ben"], ", ".join(d["projects"]), d["doc"], d["file"], d["status"]] for d in chunk]
+        return {"rows": rows, "page": page, "pages": pages, "total": len(docs)}
+
+    def save(self, data):
+        upload = self.uploads.get(data.get("upload"))
+        missing = [k for k in ("ben", "doc", "issue", "expiry") if not data.get(k)]
+        if missing or not data.get("projects") or upload is None:
+            return None, f"Λείπουν πεδία: {', '.join(missing) or 'έργα/αρχείο'}"
+        doc = {"ben": data["ben"], "projects": data["projects"], "doc": data["doc"],
+               "file": upload["name"], "size": upload["size"], "issue": data["issue"], "expiry": data["expiry"],
+               "comments": data.get("comments", ""), "status": "Αποθηκευμένο",
+               "saved_at": datetime.now().isoformat(timespec="seconds")}
+        with self.lock:
+            doc["id"] = len(self.documents) + 1
+            self.documents.append(doc)
+            self.counters["saved"] += 1
+        return doc, None
+
+    def submit(self, doc_id):
+        with self.lock:
+            for doc in self.documents:
+                if doc["id"] == doc_id:
+                    doc["status"] = "Υποβλήθηκε"
+                    self.counters["submitted"] += 1
+                    return True
+        return False
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, documents=len(self.documents))
+
+    # --- server ---
+    def start(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), make_handler(self))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def make_handler(portal):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def session(self):
+            for part in (self.headers.get("Cookie") or "").split(";"):
+                key, _, value = part.strip().partition("=")
+                if key == "opske_session" and value in portal.sessions:
+                    return value
+            return None
+
+        def send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def redirect(self, location, headers=None):
+            self.send(302, b"", headers=dict(headers or {}, Location=location))
+
+        def send_json(self, data, status=200):
+            self.send(status, json.dumps(data, ensure_ascii=False), "application/json; charset=utf-8")
+
+        def body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def do_GET(self):
+            portal.count("requests")
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            path = url.path
+
+            if path.startswith("/static/"):
+                name = path.rsplit("/", 1)[-1]
+                portal.sleep(portal.asset_latency_ms)
+                if name == "app.js":
+                    return self.send(200, APP_JS, "application/javascript; charset=utf-8")
+                if name in portal.statics:
+                    types = {"js": "application/javascript", "css": "text/css", "woff2": "font/woff2", "png": "image/png"}
+                    return self.send(200, portal.statics[name], types[name.rsplit(".", 1)[-1]])
+                return self.send(404, "not found", "text/plain")
+
+            if path == "/":
+                return self.send(200, page("ΟΠΣΚΕ", '<a class="btn" href="/login">Σύνδεση ΑΑΔΕ</a>'))
+            if path == "/login":
+                return self.send(200, page("ΑΑΔΕ", LOGIN_FORM))
+            if path == "/consent":
+                return self.send(200, page("ΑΑΔΕ", CONSENT_FORM))
+
+            if self.session() is None:
+                if path.startswith("/api/"):
+                    return self.send_json({"error": "unauthorized"}, 401)
+                return self.redirect("/")
+
+            if path == "/dashboard":
+                portal.sleep(portal.page_latency_ms)
+                return self.send(200, page("ΟΠΣΚΕ", f'<a href="{LIST_PATH}">Τα Δικαιολογητικά Δικαιούχου μου</a>'))
+            if path == LIST_PATH:
+                portal.sleep(portal.page_latency_ms)
+                return self.send(200, app_page("list"))
+            if path == FORM_PATH:
+                portal.sleep(portal.page_latency_ms)
+                if portal.should_fail():
+                    return self.send(503, page("Σφάλμα", "Η υπηρεσία δεν είναι διαθέσιμη"))
+                return self.send(200, app_page("form"))
+
+            portal.sleep(portal.latency_ms)
+            if path == "/api/beneficiaries":
+                return self.send_json([c["ben"] for c in portal.catalog])
+            if path == "/api/projects":
+                company = portal.by_afm.get((query.get("afm") or [""])[0])
+                return self.send_json([f"{code} - Επένδυση {code[-5:]}" for code in (company["projects"] if company else [])])
+            if path == "/api/doctypes":
+                return self.send_json([f"{code} {title}" for code, title in DOC_TYPES])
+            if path == "/api/documents":
+                return self.send_json(portal.list_rows(int((query.get("page") or ["0"])[0])))
+            if path == "/api/stats":
+                return self.send_json(portal.stats())
+            return self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            portal.count("requests")
+            url = urlsplit(self.path)
+            path = url.path
+            payload = self.body()
+
+            if path == "/login":
+                return self.redirect("/consent")
+            if path == "/consent":
+                token = secrets.token_hex(16)
+                with portal.lock:
+                    portal.sessions.add(token)
+                return self.redirect("/dashboard", {"Set-Cookie": f"opske_session={token}; Path=/; HttpOnly"})
+
+            if self.session() is None:
+                return self.send_json({"error": "unauthorized"}, 401)
+            portal.sleep(portal.latency_ms)
+
+            if path == "/api/upload":
+                name = (parse_qs(url.query).get("name") or ["file"])[0]
+                upload_id = secrets.token_hex(8)
+                with portal.lock:
+                    portal.uploads[upload_id] = {"name": name, "size": len(payload)}
+                portal.count("upload_bytes", len(payload))
+                return self.send_json({"id": upload_id, "size": len(payload)})
+            if path == "/api/save":
+                if portal.should_fail():
+                    return self.send_json({"error": "Εσωτερικό σφάλμα"}, 500)
+                doc, error = portal.save(json.loads(payload or b"{}"))
+                if error:
+                    return self.send_json({"error": error}, 400)
+                return self.send_json({"id": doc["id"]})
+            if path == "/api/submit":
+                ok = portal.submit(json.loads(payload or b"{}").get("id"))
+                return self.send_json({"ok": ok}, 200 if ok else 404)
+            return self.send_json({"error": "not found"}, 404)
+
+    return Handler
+
+
+def page(title, body):
+    return f"""<!doctype html><html lang="el"><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="font-family: sans-serif; padding: 20px">{body}</body></html>"""
+
+
+def app_page(view):
+    # Το "κέλυφος" της εφαρμογής: ξαναφορτώνει bundle, θέμα, εικονίδια και λογότυπο σε κάθε πλοήγηση
+    return f"""<!doctype html><html lang="el"><head><meta charset="utf-8"><title>ΟΠΣΚΕ</title>
+<link rel="stylesheet" href="/static/theme.css">
+<style>{APP_CSS}</style>
+<script src="/static/vendor.js"></script>
+</head><body>
+<nav><img src="/static/logo.png" alt="" width="40" height="20"> <span class="pi">★</span>
+<a href="{LIST_PATH}">Τα Δικαιολογητικά μου</a></nav>
+<main id="app" data-view="{view}" data-list="{LIST_PATH}" data-form="{FORM_PATH}"></main>
+<script src="/static/app.js"></script>
+</body></html>"""
+
+
+LOGIN_FORM = """<form method="post" action="/login">
+<label>Χρήστης <input id="j_username" name="j_username"></label>
+<label>Κωδικός <input id="j_password" name="j_password" type="password"></label>
+<button type="submit">Σύνδεση</button></form>"""
+
+CONSENT_FORM = """<form method="post" action="/consent"><p>Συναίνεση για τη χρήση των στοιχείων σας.</p>
+<button id="btn-submit" type="submit">Συνέχεια</button></form>"""
+
+APP_CSS = """
+@font-face { font-family: primeicons; src: url(/static/primeicons.woff2) format('woff2'); }
+body { font-family: sans-serif; margin: 0; min-height: 1600px; }
+nav { padding: 8px 16px; background: #eef; } main { padding: 16px; }
+.pi { font-family: primeicons, sans-serif; }
+.field { margin: 10px 0; position: relative; }
+.p-dropdown, .p-multiselect { display: inline-block; min-width: 380px; border: 1px solid #999; padding: 6px; cursor: pointer; }
+.p-dropdown-panel, .p-multiselect-panel, .p-datepicker { position: absolute; background: #fff; border: 1px solid #666;
+  z-index: 10; max-height: 260px; overflow: auto; min-width: 380px; }
+.p-datepicker { max-height: none; min-width: 260px; }
+li[role=option] { list-style: none; padding: 4px 8px; cursor: pointer; } li.p-highlight { background: #cde; }
+.p-datepicker td { padding: 2px 6px; cursor: pointer; } .p-datepicker-other-month { color: #bbb; }
+.p-toast { position: fixed; top: 10px; right: 10px; background: #dfd; padding: 10px; }
+.p-toast.error { background: #fdd; }
+.p-paginator-next.p-disabled { opacity: .4; }
+"""
+
+APP_JS = r"""
+(function () {
+  const app = document.getElementById('app');
+  const LIST = app.dataset.list, FORM = app.dataset.form;
+  const MONTHS = ['Ιανουάριος', 'Φεβρουάριος', 'Μάρτιος', 'Απρίλιος', 'Μάιος', 'Ιούνιος', 'Ιούλιος',
+                  'Αύγουστος', 'Σεπτέμβριος', 'Οκτώβριος', 'Νοέμβριος', 'Δεκέμβριος'];
+  const el = (tag, attrs, ...children) => {
+    const e = document.createElement(tag);
+    Object.entries(attrs || {}).forEach(([k, v]) => k === 'class' ? e.className = v : e.setAttribute(k, v));
+    children.forEach(c => e.append(c));
+    return e;
+  };
+  const api = (path, options) => fetch(path, options).then(r => r.ok ? r.json() : r.json().then(e => Promise.reject(e)));
+  const toast = (text, error) => {
+    const t = el('div', {class: 'p-toast' + (error ? ' error' : '')},
+                 el('div', {class: 'p-toast-message'}, el('div', {class: 'p-toast-detail'}, text)));
+    document.body.append(t);
+    setTimeout(() => t.remove(), 3000);
+  };
+  let overlay = null;
+  const closeOverlay = () => { if (overlay) { overlay.remove(); overlay = null; } };
+  document.addEventListener('mousedown', ev => {
+    if (overlay && !overlay.contains(ev.target) && !ev.target.closest('[data-owner]')) closeOverlay();
+  });
+  document.addEventListener('keydown', ev => { if (ev.key === 'Escape') closeOverlay(); });
+
+  // ---------------- Λίστα ----------------
+  function listView() {
+    let page = 0;
+    const head = el('tr', {}, ...['Δικαιούχος (ΑΦΜ)', 'Έργο', 'Δικαιολογητικό', 'Αρχείο', 'Κατάσταση'].map(h => el('th', {}, h)));
+    const body = el('tbody');
+    const next = el('button', {class: 'p-paginator-next p-disabled', type: 'button'}, '›');
+    const prev = el('button', {class: 'p-paginator-prev p-disabled', type: 'button'}, '‹');
+    const info = el('span', {class: 'p-paginator-current'});
+    const add = el('button', {id: 'add-btn', type: 'button'}, 'Προσθήκη');
+    add.addEventListener('click', () => { location.href = FORM; });
+    const load = () => api('/api/documents?page=' + page).then(data => {
+      body.replaceChildren(...(data.rows.length ? data.rows.map(r => el('tr', {}, ...r.map(c => el('td', {}, c))))
+                                                : [el('tr', {}, el('td', {colspan: 5}, 'Δεν βρέθηκαν εγγραφές'))]));
+      info.textContent = (data.page + 1) + ' / ' + data.pages;
+      next.classList.toggle('p-disabled', data.page + 1 >= data.pages);
+      next.disabled = data.page + 1 >= data.pages;
+      prev.classList.toggle('p-disabled', data.page === 0);
+      prev.disabled = data.page === 0;
+    });
+    next.addEventListener('click', () => { page += 1; load(); });
+    prev.addEventListener('click', () => { page = Math.max(0, page - 1); load(); });
+    load().then(() => app.replaceChildren(
+      el('h2', {}, 'Τα Δικαιολογητικά μου'), add,
+      el('div', {class: 'p-datatable'}, el('table', {}, el('thead', {}, head), body)),
+      el('div', {class: 'p-paginator'}, prev, info, next)));
+  }
+
+  // ---------------- Φόρμα ----------------
+  function dropdown(placeholder, source, onSelect) {
+    const label = el('span', {role: 'combobox', class: 'p-dropdown-label', 'aria-expanded': 'false'}, placeholder);
+    const box = el('div', {class: 'p-dropdown', 'data-owner': '1'}, label);
+    box.addEventListener('click', () => {
+      if (overlay) { closeOverlay(); return; }
+      const filter = el('input', {class: 'p-dropdown-filter', type: 'text'});
+      const list = el('ul', {class: 'p-dropdown-items', role: 'listbox'});
+      const render = () => {
+        const q = filter.value.toLowerCase();
+        list.replaceChildren(...source().filter(o => o.toLowerCase().includes(q)).map(o => {
+          const li = el('li', {role: 'option', class: 'p-dropdown-item'}, o);
+          li.addEventListener('click', () => { label.textContent = o; closeOverlay(); onSelect(o); });
+          return li;
+        }));
+      };
+      filter.addEventListener('input', render);
+      overlay = el('div', {class: 'p-dropdown-panel'}, el('div', {class: 'p-dropdown-header'}, filter), list);
+      box.parentNode.append(overlay);
+      render();
+      filter.focus();
+    });
+    return box;
+  }
+
+  function multiselect(source, selected, ready) {
+    const label = el('div', {class: 'p-multiselect-label'}, 'Επιλέξτε έργα');
+    const box = el('div', {class: 'p-multiselect', 'data-owner': '1'}, el('div', {class: 'p-multiselect-label-container'}, label));
+    box.addEventListener('click', () => {
+      if (overlay) { closeOverlay(); return; }
+      const list = el('ul', {class: 'p-multiselect-items', role: 'listbox'});
+      overlay = el('div', {class: 'p-multiselect-panel'}, list);
+      box.parentNode.append(overlay);
+      // Τα έργα φορτώνουν ασύγχρονα μετά την επιλογή δικαιούχου, όπως στην πύλη
+      ready().then(() => list.replaceChildren(...source().map(o => {
+        const li = el('li', {role: 'option', class: 'p-multiselect-item' + (selected.has(o) ? ' p-highlight' : ''),
+                             'aria-selected': String(selected.has(o))}, o);
+        li.addEventListener('click', () => {
+          selected.has(o) ? selected.delete(o) : selected.add(o);
+          li.classList.toggle('p-highlight', selected.has(o));
+          li.setAttribute('aria-selected', String(selected.has(o)));
+          label.textContent = selected.size ? [...selected].join(', ') : 'Επιλέξτε έργα';
+        });
+        return li;
+      })));
+    });
+    return box;
+  }
+
+  function datepicker(id) {
+    const input = el('input', {id: id, type: 'text', class: 'p-inputtext', autocomplete: 'off', 'data-owner': '1'});
+    const parse = v => {
+      const m = /^(\d{1,2})[\/.-](\d{1,2})[\/.-](\d{4})$/.exec(v.trim());
+      if (!m) return null;
+      const d = new Date(+m[3], +m[2] - 1, +m[1]);
+      return d.getMonth() === +m[2] - 1 ? d : null;
+    };
+    const fmt = d => String(d.getDate()).padStart(2, '0') + '/' + String(d.getMonth() + 1).padStart(2, '0') + '/' + d.getFullYear();
+    input.addEventListener('blur', () => { const d = parse(input.value); input.value = d ? fmt(d) : ''; });
+    input.addEventListener('click', () => {
+      if (overlay) closeOverlay();
+      let shown = parse(input.value) || new Date();
+      shown = new Date(shown.getFullYear(), shown.getMonth(), 1);
+      const title = el('div', {class: 'p-datepicker-title'});
+      const grid = el('tbody');
+      const render = () => {
+        title.textContent = MONTHS[shown.getMonth()] + ' ' + shown.getFullYear();
+        const start = new Date(shown);
+        start.setDate(1 - ((shown.getDay() + 6) % 7));
+        const rows = [];
+        for (let w = 0; w < 6; w++) {
+          const cells = [];
+          for (let i = 0; i < 7; i++) {
+            const d = new Date(start.getFullYear(), start.getMonth(), start.getDate() + w * 7 + i);
+            const td = el('td', {class: d.getMonth() === shown.getMonth() ? '' : 'p-datepicker-other-month'}, el('span', {}, String(d.getDate())));
+            td.addEventListener('click', () => { input.value = fmt(d); closeOverlay(); });
+            cells.push(td);
+          }
+          rows.push(el('tr', {}, ...cells));
+        }
+        grid.replaceChildren(...rows);
+      };
+      const prev = el('button', {class: 'p-datepicker-prev', type: 'button'}, '‹');
+      const next = el('button', {class: 'p-datepicker-next', type: 'button'}, '›');
+      prev.addEventListener('click', () => { shown.setMonth(shown.getMonth() - 1); render(); });
+      next.addEventListener('click', () => { shown.setMonth(shown.getMonth() + 1); render(); });
+      overlay = el('div', {class: 'p-datepicker'}, el('div', {class: 'p-datepicker-header'}, prev, title, next), el('table', {}, grid));
+      input.parentNode.append(overlay);
+      render();
+    });
+    return input;
+  }
+
+  function formView() {
+    let beneficiaries = [], projects = [], doctypes = [], projectsReady = Promise.resolve();
+    const state = {ben: '', projects: new Set(), doc: '', upload: null, saved: null};
+    const ben = dropdown('Επιλέξτε δικαιούχο', () => beneficiaries, value => {
+      state.ben = value;
+      state.projects.clear();
+      projects = [];
+      const afm = (/\d{9}/.exec(value) || [''])[0];
+      projectsReady = api('/api/projects?afm=' + afm).then(list => { projects = list; });
+    });
+    const proj = multiselect(() => projects, state.projects, () => projectsReady);
+    const doc = dropdown('Επιλέξτε δικαιολογητικό', () => doctypes, value => { state.doc = value; });
+    const comments = el('textarea', {id: 'comments', rows: '2', cols: '50'});
+    const issue = datepicker('issueDate'), expiry = datepicker('expirationDate');
+    const fileInput = el('input', {type: 'file', id: 'file-input', style: 'display:none', accept: '.pdf,.jpg,.jpeg,.png'});
+    const fileName = el('span', {class: 'file-name'});
+    const fileBtn = el('button', {type: 'button', id: 'file-btn'}, 'Επιλογή Αρχείου');
+    fileBtn.addEventListener('click', () => fileInput.click());
+    fileInput.addEventListener('change', () => {
+      const f = fileInput.files[0];
+      if (!f) return;
+      fileName.textContent = f.name;
+      state.upload = fetch('/api/upload?name=' + encodeURIComponent(f.name), {method: 'POST', body: f})
+        .then(r => r.ok ? r.json() : Promise.reject(r));
+    });
+    const save = el('button', {type: 'button', id: 'save-btn'}, 'Αποθήκευση');
+    const submit = el('button', {type: 'button', id: 'submit-btn', disabled: ''}, 'Υποβολή');
+    const back = el('button', {type: 'button', id: 'back-btn'}, 'Επιστροφή');
+    back.addEventListener('click', () => { location.href = LIST; });
+    save.addEventListener('click', () => {
+      save.disabled = true;
+      Promise.resolve(state.upload).then(up => api('/api/save', {method: 'POST', headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({ben: state.ben, projects: [...state.projects], doc: state.doc, comments: comments.value,
+                              issue: issue.value, expiry: expiry.value, upload: up && up.id})}))
+        .then(res => { state.saved = res.id; toast('Η εγγραφή αποθηκεύτηκε επιτυχώς'); submit.disabled = false; })
+        .catch(err => { toast('Σφάλμα: ' + ((err && err.error) || 'αποτυχία'), true); save.disabled = false; });
+    });
+    submit.addEventListener('click', () => {
+      submit.disabled = true;
+      api('/api/submit', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({id: state.saved})})
+        .then(() => toast('Η εγγραφή υποβλήθηκε'))
+        .catch(() => { toast('Σφάλμα υποβολής', true); submit.disabled = false; });
+    });
+    Promise.all([api('/api/beneficiaries'), api('/api/doctypes')]).then(([b, d]) => {
+      beneficiaries = b;
+      doctypes = d;
+      const field = (text, ...nodes) => el('div', {class: 'field'}, el('label', {}, text + ' '), ...nodes);
+      app.replaceChildren(el('h2', {}, 'Νέο δικαιολογητικό'),
+        field('Δικαιούχος', ben), field('Έργα', proj), field('Δικαιολογητικό', doc), field('Σχόλια', comments),
+        field('Ημ. έκδοσης', issue), field('Ημ. λήξης', expiry), field('Αρχείο', fileBtn, fileInput, fileName),
+        el('div', {class: 'field'}, save, ' ', submit, ' ', back));
+    });
+  }
+
+  (app.dataset.view === 'form' ? formView : listView)();
+})();
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Τοπικό mock της πύλης ΟΠΣΚΕ")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=150, help="καθυστέρηση API (±50%%)")
+    parser.add_argument("--page-latency-ms", type=int, default=300, help="καθυστέρηση σελίδων")
+    parser.add_argument("--asset-latency-ms", type=int, default=50, help="καθυστέρηση στατικών αρχείων")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="πιθανότητα σφάλματος σε φόρμα/αποθήκευση")
+    args = parser.parse_args(argv)
+    portal = MockPortal(synthetic_catalog(args.companies), args.latency_ms, args.page_latency_ms,
+                        args.asset_latency_ms, args.fail_rate)
+    url = portal.start(port=args.port)
+    print(f"Mock ΟΠΣΚΕ στο {url} (OPSKE_BASE_URL={url}) - Ctrl+C για τερματισμό")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        portal.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,147 @@
 import os
-import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
-import pandas as pd
-from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
-import re
-
-# -------------------------- ΡΥΘΜΙΣΕΙΣ --------------------------
-SCREEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshots")
-USERNAME = "USERNAME"
-PASSWORD = "PASSWORD"
-os.makedirs(SCREEN_DIR, exist_ok=True)
-
-ALLOWED_EXT = {'.pdf', '.jpg', '.jpeg', '.png'}
-MAX_SIZE_MB = 10
-
-# Σχήματα και βάρη για έλεγχο ΑΦΜ
-AFM_REGEX = r'^(.+) - (\d{9})$'
-AFM_WEIGHTS = [256, 128, 64, 32, 16, 8, 4, 2]
+import queue
+import csv
+from opske_core import (UploadEngine, PACING_PROFILES, DEFAULT_PACING, DEFAULT_WORKERS, MAX_WORKERS,
+                         ASSET_MODES, DEFAULT_ASSET_MODE, EVIDENCE_MODES, DEFAULT_EVIDENCE, health_text)
+from opske_jobs import JobStore
 
 # -------------------------- GUI --------------------------
+# Ρυθμός ανανέωσης: τα γεγονότα του worker μαζεύονται σε ουρά και σχεδιάζονται ανά "καρέ"
+GUI_FRAME_MS = 50
+GUI_MAX_EVENTS_PER_FRAME = 5000
+# Σελιδοποίηση αποτελεσμάτων: το Treeview κρατά μόνο μία σελίδα, τα δεδομένα μένουν στη μνήμη
+RESULTS_PAGE_SIZE = 500
+FILTER_ALL = "Όλα"
+FILTER_FAILED = "Μόνο αποτυχίες"
+
+# ---- ΣΕΛΙΔΟΠΟΙΗΜΕΝΗ ΛΙΣΤΑ ----
+class PagedTreeView:
+    # Εγγραφή: (όνομα, κατάσταση, tag, λόγος, κωδικός έργου)
+    def __init__(self, parent, title, columns, height):
+        self.records = []
+        self.visible = []      # δείκτες των εγγραφών που περνούν το φίλτρο
+        self.scanned = 0       # ως πού έχει εφαρμοστεί το φίλτρο στις records
+        self.page = 0
+        self.follow = True     # ακολουθεί την τελευταία σελίδα όσο έρχονται νέα
+        self.shown = None      # (σελίδα, πλήθος γραμμών) που είναι ήδη στο Treeview
+        self.dirty = False
+        self.columns = columns
+
+        header = ttk.Frame(parent)
+        header.pack(fill='x', padx=10)
+        ttk.Label(header, text=title).pack(side='left')
+        ttk.Button(header, text="Εξαγωγή CSV", command=self.export_csv).pack(side='right', padx=2)
+        ttk.Button(header, text="▶", width=3, command=lambda: self.goto(self.page + 1)).pack(side='right')
+        self.page_label = ttk.Label(header, text="0/0")
+        self.page_label.pack(side='right', padx=5)
+        ttk.Button(header, text="◀", width=3, command=lambda: self.goto(self.page - 1)).pack(side='right')
+        self.project_var = tk.StringVar()
+        entry = ttk.Entry(header, width=12, textvariable=self.project_var)
+        entry.pack(side='right', padx=(2, 10))
+        entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Label(header, text="Κωδ. έργου:").pack(side='right')
+        self.filter_var = tk.StringVar(value=FILTER_ALL)
+        combo = ttk.Combobox(header, values=[FILTER_ALL, FILTER_FAILED], width=16, textvariable=self.filter_var, state='readonly')
+        combo.pack(side='right', padx=(2, 10))
+        combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filter())
+
+        container = ttk.Frame(parent)
+        container.pack(fill='both', expand=True, padx=10)
+        self.tree = ttk.Treeview(container, columns=[c for c, _ in columns], height=height, show='tree headings')
+        self.tree.heading("#0", text="Όνομα Αρχείου")
+        for col, text in columns:
+            self.tree.heading(col, text=text)
+        scroll = ttk.Scrollbar(container, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side='left', fill='both', expand=True)
+        scroll.pack(side='right', fill='y')
+        self.tree.tag_configure("ok", foreground="green")
+        self.tree.tag_configure("fail", foreground="red")
+        self.tree.tag_configure("info", foreground="blue")
+
+    def add(self, name, value, tag, reason="", project=""):
+        self.records.append((name, value, tag, reason or "", project or ""))
+        self.dirty = True
+
+    def clear(self):
+        self.records = []
+        self.visible = []
+        self.scanned = 0
+        self.page = 0
+        self.follow = True
+        self.shown = None
+        self.tree.delete(*self.tree.get_children())
+        self.page_label.config(text="0/0")
+
+    def matches(self, rec):
+        if self.filter_var.get() == FILTER_FAILED and rec[2] != "fail":
+            return False
+        project = self.project_var.get().strip()
+        return not project or rec[4] == project
+
+    def apply_filter(self):
+        self.visible = []
+        self.scanned = 0
+        self.page = 0
+        self.follow = True
+        self.shown = None
+        self.dirty = True
+        self.refresh()
+
+    def pages(self):
+        return max(1, -(-len(self.visible) // RESULTS_PAGE_SIZE))
+
+    def goto(self, page):
+        self.page = min(max(page, 0), self.pages() - 1)
+        self.follow = self.page == self.pages() - 1
+        self.dirty = True
+        self.refresh()
+
+    def refresh(self):
+        # Καλείται μία φορά ανά καρέ· το φίλτρο εφαρμόζεται μόνο στις νέες εγγραφές
+        if not self.dirty:
+            return
+        self.dirty = False
+        records = self.records
+        for i in range(self.scanned, len(records)):
+            if self.matches(records[i]):
+                self.visible.append(i)
+        self.scanned = len(records)
+        if self.follow:
+            self.page = self.pages() - 1
+        start = self.page * RESULTS_PAGE_SIZE
+        rows = self.visible[start:start + RESULTS_PAGE_SIZE]
+        if self.shown and self.shown[0] == self.page and self.shown[1] <= len(rows):
+            new_rows = rows[self.shown[1]:]   # ίδια σελίδα: προσθήκη μόνο των νέων γραμμών
+        else:
+            self.tree.delete(*self.tree.get_children())
+            new_rows = rows
+        for i in new_rows:
+            name, value, tag, reason, project = records[i]
+            values = (value, reason, project)[:len(self.columns)]
+            self.tree.insert("", "end", text=name, values=values, tags=(tag,) if tag else ())
+        self.shown = (self.page, len(rows))
+        if self.follow and new_rows:
+            self.tree.yview_moveto(1.0)
+        self.page_label.config(text=f"{self.page + 1}/{self.pages()} ({len(self.visible)})")
+
+    def export_csv(self):
+        path = filedialog.asksaveasfilename(title="Εξαγωγή CSV", defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        self.refresh()
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            n = len(self.columns)
+            writer.writerow(["Όνομα αρχείου"] + [text for _, text in self.columns] + (["Κωδ. έργου"] if n < 3 else []))
+            for i in self.visible:
+                name, value, tag, reason, project = self.records[i]
+                writer.writerow([name, *(value, reason, project)[:n]] + ([project] if n < 3 else []))
+        messagebox.showinfo("Εξαγωγή", f"Γράφτηκαν {len(self.visible)} γραμμές στο {os.path.basename(path)}")
+
 class AppGUI:
     def __init__(self, root):
         self.root = root
@@ -30,14 +150,17 @@ class AppGUI:
 
         self.folder = None
         self.excel_path = None
-        self.play_flag = threading.Event()
-        self.play_flag.set()
+        self.engine = UploadEngine()
+        # Ο worker μόνο γράφει στην ουρά· όλες οι κλήσεις Tk γίνονται στο main loop
+        self.events = queue.Queue()
+        self.engine.subscribe(lambda kind, data: self.events.put((kind, data)))
         self.results = []
         self.submit_flag = False
         self.total_files = 0
         self.processed = 0
         self.check_performed = False
         self.check_passed = False
+        self.checking = False
 
         # --- Κουμπιά ---
         btn_frame = ttk.Frame(root)
@@ -49,6 +172,23 @@ class AppGUI:
         ttk.Button(btn_frame, text="Έναρξη (Υποβολή)", command=lambda: self.start_thread(submit=True)).pack(side='left', padx=5)
         self.pause_btn = ttk.Button(btn_frame, text="Pause", command=self.toggle_pause)
         self.pause_btn.pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Στην ουρά", command=self.enqueue).pack(side='left', padx=5)
+        ttk.Label(btn_frame, text="Workers:").pack(side='left', padx=(15, 2))
+        self.workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+        ttk.Spinbox(btn_frame, from_=1, to=MAX_WORKERS, width=3, textvariable=self.workers_var, state='readonly').pack(side='left')
+        ttk.Label(btn_frame, text="Ρυθμός:").pack(side='left', padx=(15, 2))
+        self.pacing_var = tk.StringVar(value=DEFAULT_PACING)
+        ttk.Combobox(btn_frame, values=list(PACING_PROFILES), width=10, textvariable=self.pacing_var, state='readonly').pack(side='left')
+        ttk.Label(btn_frame, text="Στατικά:").pack(side='left', padx=(15, 2))
+        self.assets_var = tk.StringVar(value=DEFAULT_ASSET_MODE)
+        ttk.Combobox(btn_frame, values=list(ASSET_MODES), width=6, textvariable=self.assets_var, state='readonly').pack(side='left')
+        ttk.Label(btn_frame, text="Αποδεικτικά:").pack(side='left', padx=(15, 2))
+        self.evidence_var = tk.StringVar(value=DEFAULT_EVIDENCE)
+        ttk.Combobox(btn_frame, values=list(EVIDENCE_MODES), width=10, textvariable=self.evidence_var, state='readonly').pack(side='left')
+        self.compress_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Συμπίεση μεγάλων", variable=self.compress_var).pack(side='left', padx=(15, 0))
+        self.pipeline_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Pipeline", variable=self.pipeline_var).pack(side='left', padx=(10, 0))
 
         # --- Μπάρα συνολικής προόδου ---
         self.progress_frame = tk.Frame(root)
@@ -57,6 +197,8 @@ class AppGUI:
         self.progress_label.pack(side='left')
         self.progress_bar = ttk.Progressbar(self.progress_frame, orient='horizontal', length=200, mode='determinate')
         self.progress_bar.pack(side='left', padx=5)
+        self.health_label = tk.Label(self.progress_frame, text="", fg="green")
+        self.health_label.pack(side='left', padx=10)
 
         # --- Τρέχον upload ---
         ttk.Label(root, text="Τρέχον upload:").pack(anchor='w', padx=10)
@@ -66,35 +208,12 @@ class AppGUI:
         self.current_tree.pack(fill='x', padx=10)
 
         # --- Αποτελέσματα ---
-        ttk.Label(root, text="Αποτελέσματα:").pack(anchor='w', padx=10)
-        result_container = ttk.Frame(root)
-        result_container.pack(fill='both', expand=True, padx=10)
-        self.result_tree = ttk.Treeview(result_container, columns=("Status",), height=10, show='tree headings')
-        self.result_tree.heading("#0", text="Όνομα Αρχείου")
-        self.result_tree.heading("Status", text="Κατάσταση")
-        result_scroll = ttk.Scrollbar(result_container, orient="vertical", command=self.result_tree.yview)
-        self.result_tree.configure(yscrollcommand=result_scroll.set)
-        self.result_tree.pack(side='left', fill='both', expand=True)
-        result_scroll.pack(side='right', fill='y')
-        
-        self.result_tree.tag_configure("ok", foreground="green")
-        self.result_tree.tag_configure("fail", foreground="red")
-        self.result_tree.tag_configure("info", foreground="blue")
+        self.result_view = PagedTreeView(root, "Αποτελέσματα:", [("Status", "Κατάσταση"), ("Reason", "Λόγος"), ("Project", "Κωδ. έργου")], 10)
 
         # --- Σύνοψη ---
-        ttk.Label(root, text="Σύνοψη:").pack(anchor='w', padx=10)
-        summary_container = ttk.Frame(root)
-        summary_container.pack(fill='both', expand=True, padx=10)
-        self.summary_tree = ttk.Treeview(summary_container, columns=("Reason",), height=8, show='tree headings')
-        self.summary_tree.heading("#0", text="Όνομα Αρχείου")
-        self.summary_tree.heading("Reason", text="Λόγος Αποτυχίας")
-        summary_scroll = ttk.Scrollbar(summary_container, orient="vertical", command=self.summary_tree.yview)
-        self.summary_tree.configure(yscrollcommand=summary_scroll.set)
-        self.summary_tree.pack(side='left', fill='both', expand=True)
-        summary_scroll.pack(side='right', fill='y')
-        
-        self.summary_tree.tag_configure("fail", foreground="red")
-        self.summary_tree.tag_configure("info", foreground="blue")
+        self.summary_view = PagedTreeView(root, "Σύνοψη:", [("Reason", "Λόγος Αποτυχίας")], 8)
+
+        self.root.after(GUI_FRAME_MS, self.drain_events)
 
     # --- Κουμπιά ---
     def pick_excel(self):
@@ -114,67 +233,33 @@ class AppGUI:
             messagebox.showinfo("Φάκελος", f"Επιλέχθηκε: {f}")
 
     def toggle_pause(self):
-        if self.play_flag.is_set():
-            self.play_flag.clear()
+        if self.engine.play_flag.is_set():
+            self.engine.play_flag.clear()
             self.pause_btn.config(text="Play")
         else:
-            self.play_flag.set()
+            self.engine.play_flag.set()
             self.pause_btn.config(text="Pause")
 
-    def validate_afm(self, afm):
-        if not afm.isdigit() or len(afm) != 9:
-            return False
-        digits = [int(d) for d in afm]
-        total = sum(d * w for d, w in zip(digits[:8], AFM_WEIGHTS))
-        remainder = total % 11
-        check_digit = 0 if remainder == 10 else remainder
-        return digits[8] == check_digit
-
-    def check_excel_structure(self, df):
-        errors = []
-        GREEK_CHARS = 'α-ωά-ώΑ-ΩΆ-Ώ'
-        
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-            file_name = str(row.get("Όνομα αρχείου", "")).strip()
-            
-            afm_field = str(row.get("Επωνυμία – ΑΦΜ", "")).strip()
-            match = re.match(AFM_REGEX, afm_field)
-            if not match:
-                errors.append((file_name, f"Στήλη A (γραμμή {row_num}): Λάθος format '{afm_field}'"))
-                continue
-            
-            company, afm = match.groups()
-            if not self.validate_afm(afm):
-                errors.append((file_name, f"Στήλη A (γραμμή {row_num}): Μη έγκυρο ΑΦΜ '{afm}'"))
-            
-            project_code = str(row.get("Κωδικός έργου", "")).strip()
-            if not re.match(f'^[a-zA-Z{GREEK_CHARS}0-9]+-\\d+$', project_code):
-                errors.append((file_name, f"Στήλη B (γραμμή {row_num}): Λάθος format '{project_code}'"))
-            
-            doc_code = str(row.get("Κωδικός Δικαιολογητικού", "")).strip()
-            if not re.match(r'^\d{2}\.\d{2}$', doc_code):
-                errors.append((file_name, f"Στήλη C (γραμμή {row_num}): Λάθος format '{doc_code}'"))
-            
-            try:
-                issue_date = pd.to_datetime(row.get("Ημερομηνία έκδοσης δικαιολογητικού"), errors='coerce')
-                if pd.isna(issue_date):
-                    errors.append((file_name, f"Στήλη E (γραμμή {row_num}): Μη έγκυρη ημερομηνία"))
-                elif issue_date > datetime.now():
-                    errors.append((file_name, f"Στήλη E (γραμμή {row_num}): Ημερομηνία έκδοσης μεταγενέστερη από σήμερα"))
-            except:
-                errors.append((file_name, f"Στήλη E (γραμμή {row_num}): Μη έγκυρη ημερομηνία"))
-            
-            try:
-                expiry_date = pd.to_datetime(row.get("Ημερομηνία λήξης δικαιολογητικού"), errors='coerce')
-                if pd.isna(expiry_date):
-                    errors.append((file_name, f"Στήλη F (γραμμή {row_num}): Μη έγκυρη ημερομηνία"))
-                elif expiry_date < datetime.now():
-                    errors.append((file_name, f"Στήλη F (γραμμή {row_num}): Ημερομηνία λήξης προγενέστερη από σήμερα"))
-            except:
-                errors.append((file_name, f"Στήλη F (γραμμή {row_num}): Μη έγκυρη ημερομηνία"))
-        
-        return errors
+    def enqueue(self):
+        # Το workbook μπαίνει στην ουρά εργασιών με τις τρέχουσες ρυθμίσεις· εκτέλεση με "python opske_jobs.py run"
+        if not self.excel_path:
+            messagebox.showwarning("Excel", "Παρακαλώ επιλέξτε αρχείο Excel!")
+            return
+        if not self.folder:
+            messagebox.showwarning("Φάκελος", "Παρακαλώ επιλέξτε φάκελο!")
+            return
+        submit = messagebox.askyesnocancel("Ουρά", "Υποβολή μετά την αποθήκευση;\n(Όχι = μόνο αποθήκευση)")
+        if submit is None:
+            return
+        store = JobStore()
+        try:
+            job_id = store.add(self.excel_path, self.folder, "submit" if submit else "save", workers=self.workers_var.get(),
+                               pacing=self.pacing_var.get(), compress=self.compress_var.get(),
+                               assets=self.assets_var.get(), pipeline=self.pipeline_var.get(),
+                               evidence=self.evidence_var.get())
+        finally:
+            store.close()
+        messagebox.showinfo("Ουρά", f"Η εργασία #{job_id} προστέθηκε στην ουρά.\nΕκτέλεση: python opske_jobs.py run")
 
     def check_files(self):
         if not self.excel_path:
@@ -183,78 +268,26 @@ class AppGUI:
         if not self.folder:
             messagebox.showwarning("Φάκελος", "Παρακαλώ επιλέξτε φάκελο!")
             return
-        
-        for i in (*self.result_tree.get_children(), *self.summary_tree.get_children()):
-            self.result_tree.delete(i) if i in self.result_tree.get_children() else None
-            self.summary_tree.delete(i) if i in self.summary_tree.get_children() else None
-        
-        self.check_performed = True
-        self.ok_count = 0
-        self.problem_count = 0
-        
+        if self.checking:
+            return
+
+        self.result_view.clear()
+        self.summary_view.clear()
+        self.check_performed = False
+        self.check_passed = False
+        self.checking = True
+        self.configure_engine()
+        threading.Thread(target=self.run_check, args=(self.excel_path, self.folder), daemon=True).start()
+
+    def run_check(self, excel_path, folder):
+        # Ο έλεγχος (ανάγνωση Excel, hash αρχείων) τρέχει εκτός του Tk thread· το αποτέλεσμα έρχεται ως γεγονός
+        passed = False
         try:
-            df = pd.read_excel(self.excel_path, dtype=str)
-            required_cols = ["Επωνυμία – ΑΦΜ", "Κωδικός έργου", "Κωδικός Δικαιολογητικού",
-                           "Όνομα αρχείου", "Ημερομηνία έκδοσης δικαιολογητικού",
-                           "Ημερομηνία λήξης δικαιολογητικού", "Παρατηρήσεις ΟΠΣΚΕ"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                messagebox.showerror("Σφάλμα Excel", f"Λείπουν οι στήλες: {', '.join(missing_cols)}")
-                self.check_passed = False
-                return
+            passed = self.engine.check()
         except Exception as e:
-            messagebox.showerror("Σφάλμα", f"Δεν μπόρεσε να διαβαστεί το Excel: {e}")
-            self.check_passed = False
-            return
-        
-        excel_errors = self.check_excel_structure(df)
-        for file_name, error_msg in excel_errors:
-            self.problem_count += 1
-            self.result_tree.insert("", "end", text=file_name, values=("Σφάλμα Excel ✗",), tags=("fail"))
-            self.result_tree.insert("", "end", text=f"  → {error_msg}", values=("",), tags=("fail"))
-        
-        for idx, row in df.iterrows():
-            fname = str(row["Όνομα αρχείου"]).strip()
-            if not fname or fname == 'nan':
-                continue
-            
-            found = False
-            for f in os.listdir(self.folder):
-                if os.path.splitext(f)[0] == fname:
-                    fpath = os.path.join(self.folder, f)
-                    if os.path.isfile(fpath):
-                        found = True
-                        ok, reason = self.validate_file(fpath)
-                        if ok:
-                            self.ok_count += 1
-                            self.result_tree.insert("", "end", text=fname, values=("Βρέθηκε ✓",), tags=("ok"))
-                        else:
-                            self.problem_count += 1
-                            self.result_tree.insert("", "end", text=fname, values=("Σφάλμα ✗",), tags=("fail"))
-                            self.result_tree.insert("", "end", text=f"  → {reason}", values=("",), tags=("fail"))
-                        break
-            
-            if not found:
-                self.problem_count += 1
-                reason = f"Δεν βρέθηκε αρχείο με το όνομα: {fname}"
-                self.result_tree.insert("", "end", text=fname, values=("Δεν βρέθηκε ✗",), tags=("fail"))
-                self.result_tree.insert("", "end", text=f"  → {reason}", values=("",), tags=("fail"))
-        
-        self.check_passed = (self.ok_count > 0 and len(excel_errors) == 0)
-        
-        self.result_tree.insert("", "end", text="", values=("",))
-        if self.check_passed:
-            if self.problem_count == 0:
-                msg = "Έλεγχος ολοκληρώθηκε με επιτυχία! Όλα είναι ΟΚ."
-            else:
-                msg = f"Έλεγχος ολοκληρώθηκε! Βρέθηκαν {self.ok_count} αρχεία ΟΚ και {self.problem_count} προβλήματα. Θα επεξεργαστούν μόνο τα ΟΚ."
-            self.result_tree.insert("", "end", text=msg, values=("✓",), tags=("ok"))
-        else:
-            if excel_errors:
-                msg = f"Ο έλεγχος βρήκε {len(excel_errors)} σφάλματα στο Excel και {self.problem_count} προβλήματα στα αρχεία. Διορθώστε όλα τα σφάλματα!"
-            else:
-                msg = "Ο έλεγχος βρήκε προβλήματα σε όλα τα αρχεία. Διορθώστε τα πριν συνεχίσετε!"
-            self.result_tree.insert("", "end", text=msg, values=("✗",), tags=("fail"))
+            self.events.put(("error", {"title": "Σφάλμα", "text": str(e)}))
+        finally:
+            self.events.put(("check_finished", {"passed": passed, "excel": excel_path, "folder": folder}))
 
     def start_thread(self, submit=False):
         if not self.excel_path:
@@ -263,6 +296,9 @@ class AppGUI:
         if not self.folder:
             messagebox.showwarning("Φάκελος", "Παρακαλώ επιλέξτε φάκελο!")
             return
+        if self.checking:
+            messagebox.showwarning("Έλεγχος", "Ο έλεγχος εκτελείται ακόμη. Περιμένετε να ολοκληρωθεί!")
+            return
         if not self.check_performed:
             messagebox.showwarning("Έλεγχος", "Παρακαλώ εκτελέστε πρώτα τον 'Έλεγχο Excel & Αρχείων'!")
             return
@@ -270,42 +306,127 @@ class AppGUI:
             messagebox.showwarning("Έλεγχος", "Ο έλεγχος βρήκε σφάλματα. Διορθώστε τα πριν συνεχίσετε!")
             return
         
-        for i in (*self.current_tree.get_children(), *self.result_tree.get_children(), *self.summary_tree.get_children()):
-            self.current_tree.delete(i) if i in self.current_tree.get_children() else None
-            self.result_tree.delete(i)   if i in self.result_tree.get_children()   else None
-            self.summary_tree.delete(i)  if i in self.summary_tree.get_children()  else None
+        self.current_tree.delete(*self.current_tree.get_children())
+        self.health_label.config(text="")
+        self.result_view.clear()
+        self.summary_view.clear()
         self.results.clear()
         self.submit_flag = submit
+        self.configure_engine()
         threading.Thread(target=self.run_agent, daemon=True).start()
 
-    def validate_file(self, fpath):
-        ext = os.path.splitext(fpath)[1].lower().strip()
-        if ext not in ALLOWED_EXT:
-            return False, f"Μη επιτρεπτή επέκταση: '{ext}' (επιτρέπονται: {', '.join(sorted(ALLOWED_EXT))})"
-        size = os.path.getsize(fpath) / (1024*1024)
-        if size > MAX_SIZE_MB:
-            return False, f"Υπέρβαση μεγέθους: {size:.2f} MB"
-        return True, None
-
-    def add_current(self, name):
-        self.current_tree.insert("", "end", iid=name, text=name, values=("0 %",))
+    def configure_engine(self):
+        self.engine.excel_path = self.excel_path
+        self.engine.folder = self.folder
+        self.engine.workers = self.workers_var.get()
+        self.engine.pacing = PACING_PROFILES[self.pacing_var.get()]
+        self.engine.compress = self.compress_var.get()
+        self.engine.assets = self.assets_var.get()
+        self.engine.pipeline = self.pipeline_var.get()
+        self.engine.evidence = self.evidence_var.get()
+
+    # --- Γεγονότα από το UploadEngine ---
+    def drain_events(self):
+        # Συγχώνευση ριπών: μόνο η τελευταία συνολική πρόοδος και η τελευταία πρόοδος ανά αρχείο σχεδιάζονται
+        # Ένα σφάλμα σε γεγονός δεν πρέπει να σταματήσει την αντλία: ο επόμενος κύκλος προγραμματίζεται πάντα
+        try:
+            progress = None
+            health = None
+            current = {}
+            for _ in range(GUI_MAX_EVENTS_PER_FRAME):
+                try:
+                    kind, data = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "progress":
+                    progress = data
+                    continue
+                if kind == "health":
+                    health = data
+                    continue
+                if kind == "current" and data["progress"] != 0:
+                    current[data["row"]] = data["progress"]
+                    continue
+                if kind == "current_done":
+                    current.pop(data["row"], None)
+                try:
+                    self.on_event(kind, data)
+                except Exception as e:
+                    print(f"Σφάλμα στο γεγονός {kind}: {e}")
+            for row, val in current.items():
+                self.update_progress(row, val)
+            if progress is not None:
+                self.update_total_progress(progress["current"], progress["total"])
+            if health is not None:
+                self.update_health(health)
+            self.result_view.refresh()
+            self.summary_view.refresh()
+        except Exception as e:
+            print(f"Σφάλμα ενημέρωσης GUI: {e}")
+        finally:
+            self.root.after(GUI_FRAME_MS, self.drain_events)
+
+    def on_event(self, kind, data):
+        if kind == "check":
+            tag = "ok" if data["ok"] else "fail"
+            self.result_view.add(data["name"], data["status"], tag, data["reason"], data.get("project"))
+        elif kind == "check_done":
+            if data["passed"]:
+                self.result_view.add(data["text"], "✓", "ok")
+            else:
+                self.result_view.add(data["text"], "✗", "fail")
+        elif kind == "check_finished":
+            self.checking = False
+            # Αν στο μεταξύ άλλαξε το Excel ή ο φάκελος, το αποτέλεσμα δεν ισχύει
+            if (data["excel"], data["folder"]) == (self.excel_path, self.folder):
+                self.check_performed = True
+                self.check_passed = data["passed"]
+        elif kind == "info":
+            self.result_view.add(data["text"], "ℹ", "info")
+        elif kind == "error":
+            messagebox.showerror(data["title"], data["text"])
+        elif kind == "current":
+            if data["progress"] == 0:
+                self.add_current(data["row"], data["name"])
+            else:
+                self.update_progress(data["row"], data["progress"])
+        elif kind == "current_done":
+            self.remove_current(data["row"])
+        elif kind == "result":
+            self.add_result(data["name"], data["ok"], data["reason"], data.get("project", ""))
+        elif kind == "skipped":
+            self.summary_view.add(data["name"], data["reason"], "info", project=data.get("project"))
+        elif kind == "progress":
+            self.update_total_progress(data["current"], data["total"])
+        elif kind == "health":
+            self.update_health(data)
+        elif kind == "summary":
+            self.fill_summary()
+
+    # iid = δείκτης γραμμής του Excel (τα ονόματα αρχείων μπορεί να επαναλαμβάνονται)
+    def add_current(self, row, name):
+        iid = str(row)
+        if self.current_tree.exists(iid):
+            self.current_tree.item(iid, text=name, values=("0 %",))
+        else:
+            self.current_tree.insert("", "end", iid=iid, text=name, values=("0 %",))
 
-    def update_progress(self, name, val):
-        self.current_tree.set(name, "Progress", f"{val} %")
-        self.root.update_idletasks()
+    def update_progress(self, row, val):
+        if self.current_tree.exists(str(row)):
+            self.current_tree.set(str(row), "Progress", f"{val} %")
 
-    def remove_current(self, name):
+    def remove_current(self, row):
         try:
-            self.current_tree.delete(name)
+            self.current_tree.delete(str(row))
         except Exception:
             pass
 
-    def add_result(self, name, ok, reason=""):
+    def add_result(self, name, ok, reason="", project=""):
         if ok:
-            self.result_tree.insert("", "end", text=name, values=("✓",), tags=("ok",))
+            self.result_view.add(name, "✓", "ok", project=project)
         else:
-            self.result_tree.insert("", "end", text=name, values=("✗",), tags=("fail",))
-            self.results.append((name, reason))
+            self.result_view.add(name, "✗", "fail", reason, project)
+            self.results.append((name, reason, project))
 
     def update_total_progress(self, current, total):
         self.processed = current
@@ -313,298 +434,23 @@ class AppGUI:
         percent = int((current / total) * 100) if total else 0
         self.progress_label.config(text=f"Πρόοδος: {current}/{total} ({percent}%)")
         self.progress_bar["value"] = percent
-        self.root.update_idletasks()
-
-    def run_agent(self):
-        with sync_playwright() as pw:
-            try:
-                self.run(pw, self.submit_flag)
-            except Exception as e:
-                messagebox.showerror("Σφάλμα", str(e))
-            finally:
-                self.fill_summary()
-
-    def run(self, playwright, submit=False):
-        df = pd.read_excel(self.excel_path, dtype=str)
-        if "Αποθήκευση" not in df.columns: df["Αποθήκευση"] = ""
-        if "Υποβολή" not in df.columns: df["Υποβολή"] = ""
-        # Προσθήκη νέας στήλης
-        if "Ημ/νία & ώρα υποβολής" not in df.columns: 
-            df["Ημ/νία & ώρα υποβολής"] = ""
-
-        skip_indices = []
-        for idx, row in df.iterrows():
-            fname = str(row["Όνομα αρχείου"]).strip()
-            if not fname or fname == 'nan':
-                skip_indices.append(idx)
-                continue
-            
-            h_val = str(row.get("Αποθήκευση", "")).strip().upper()
-            i_val = str(row.get("Υποβολή", "")).strip().upper()
-            
-            if i_val == "TRUE":
-                self.results.append((fname, "Το αρχείο είχε υποβληθεί ήδη!"))
-                skip_indices.append(idx)
-                self.summary_tree.insert("", "end", text=fname, values=("Το αρχείο είχε υποβληθεί ήδη!",), tags=("info",))
-            elif h_val == "TRUE" and not submit:
-                self.results.append((fname, "Το αρχείο είχε αποθηκευτεί ήδη!"))
-                skip_indices.append(idx)
-                self.summary_tree.insert("", "end", text=fname, values=("Το αρχείο είχε αποθηκευτεί ήδη!",), tags=("info",))
-
-        if submit:
-            mask = df["Υποβολή"].astype(str).str.strip().str.upper() == "TRUE"
-        else:
-            h_mask = df["Αποθήκευση"].astype(str).str.strip().str.upper() == "TRUE"
-            i_mask = df["Υποβολή"].astype(str).str.strip().str.upper() == "TRUE"
-            mask = h_mask | i_mask
-
-        if mask.all():
-            msg = "Όλα τα δικαιολογητικά έχουν υποβληθεί" if submit else "Όλα τα δικαιολογητικά έχουν αποθηκευτεί/υποβληθεί"
-            self.result_tree.insert("", "end", text=msg, values=("ℹ",), tags=("info",))
-            return
-
-        to_process = df[~mask].copy()
-        total = len(to_process)
-        self.update_total_progress(0, total)
-
-        browser = playwright.chromium.launch(headless=False, slow_mo=300)
-        page = browser.new_page()
-        page.set_default_timeout(30_000)
-
-        page.goto("https://app.opske.gr/ ")
-        page.click("text=Σύνδεση ΑΑΔΕ")
-        page.fill("#j_username", USERNAME)
-        page.fill("#j_password", PASSWORD)
-        page.click("button:has-text('Σύνδεση')")
-        page.wait_for_selector("#btn-submit")
-        page.click("#btn-submit")
-        page.click("text=Τα Δικαιολογητικά Δικαιούχου μου")
-
-        for idx, (index, row) in enumerate(to_process.iterrows(), 1):
-            self.play_flag.wait()
-            base_name = str(row["Όνομα αρχείου"]).strip()
-
-            real_path = None
-            for f in os.listdir(self.folder):
-                if os.path.splitext(f)[0] == base_name:
-                    candidate = os.path.join(self.folder, f)
-                    if os.path.isfile(candidate):
-                        real_path = candidate
-                        break
-            if real_path is None:
-                self.add_result(base_name, False, f"Δεν βρέθηκε αρχείο με όνομα: {base_name}")
-                self.update_total_progress(idx, total)
-                continue
-
-            ok, reason = self.validate_file(real_path)
-            if not ok:
-                self.add_result(base_name, False, reason)
-                self.update_total_progress(idx, total)
-                continue
-
-            self.add_current(base_name)
-            self.update_progress(base_name, 10)
-            try:
-                d_i, m_i, y_i = excel_date_to_parts(row["Ημερομηνία έκδοσης δικαιολογητικού"])
-                d_e, m_e, y_e = excel_date_to_parts(row["Ημερομηνία λήξης δικαιολογητικού"])
-                
-                row_dict = {
-                    "ben": row["Επωνυμία – ΑΦΜ"],
-                    "app": row["Κωδικός έργου"],
-                    "doc": row["Κωδικός Δικαιολογητικού"],
-                    "note": row["Παρατηρήσεις ΟΠΣΚΕ"],
-                    "d_i": d_i, "m_i": m_i, "y_i": y_i,
-                    "d_e": d_e, "m_e": m_e, "y_e": y_e,
-                    "fname": row["Όνομα αρχείου"]
-                }
-                
-                self.upload_row(page, row_dict, real_path, submit)
-                self.remove_current(base_name)
-                self.add_result(base_name, True)
-
-                # Ενημέρωση Excel
-                df.loc[index, "Αποθήκευση"] = "TRUE"
-                df.loc[index, "Υποβολή"] = "TRUE" if submit else "FALSE"
-                
-                # ΔΙΟΡΘΩΜΕΝΗ ΓΡΑΜΜΗ ΕΔΩ:
-                now_str = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                df.loc[index, "Ημ/νία & ώρα υποβολής"] = now_str
-
-            except Exception as e:
-                self.remove_current(base_name)
-                self.add_result(base_name, False, str(e))
-                print(f"Σφάλμα στο αρχείο {base_name}: {e}")
-                
-                try:
-                    print("Προσπάθεια επαναφοράς στην αρχική σελίδα...")
-                    page.goto("https://app.opske.gr/dashboard/invoices/supporting-document/my-supporting-document", timeout=10000)
-                    page.wait_for_load_state("networkidle")
-                except:
-                    print("Η επαναφορά απέτυχε, συνεχίζουμε...")
-
-            self.update_total_progress(idx, total)
-
-        df.to_excel(self.excel_path, index=False)
-        browser.close()
-
-    def upload_row(self, page, row, fpath, submit=False):
-        ben = str(row["ben"]).strip()
-        app = str(row["app"]).strip()
-        doc = str(row["doc"]).strip()
-        note = str(row["note"]).strip()
-
-        # 1. Κλικ Προσθήκη
-        try:
-            page.wait_for_selector("text=Προσθήκη", state="visible", timeout=10000)
-            page.click("text=Προσθήκη")
-        except:
-            print("Δεν βρέθηκε το κουμπί Προσθήκη - Προσπάθεια επαναφοράς...")
-            return 
-            
-        time.sleep(1)
-
-        # 2-5. Dropdowns & Comments
-        page.click("(//span[@role='combobox'])[1]")
-        flt = ben[:6]
-        suf = ben[-3:]
-        page.fill("//input[contains(@class,'p-dropdown-filter')]", flt)
-        for li in page.locator("//li[@role='option']").all():
-            if suf in li.text_content().strip():
-                li.click()
-                break
-
-        page.click("div.p-multiselect-label-container")
-        for li in page.locator("//li[@role='option']").all():
-            if app.upper() in li.text_content().strip().upper():
-                li.click()
-                break
-        page.click("body")
-
-        page.click("(//span[@role='combobox'])[2]")
-        page.fill("//input[contains(@class,'p-dropdown-filter')]", doc[:5])
-        page.click("(//li[@role='option'])[1]")
-
-        page.fill("#comments", note)
-
-        # ---------------------------------------------------------
-        # ΗΜΕΡΟΜΗΝΙΕΣ: ΜΕΘΟΔΟΣ ΗΜΕΡΟΛΟΓΙΟΥ (CLICKS ONLY)
-        # ---------------------------------------------------------
-        
-        # 1. Ημερομηνία Έκδοσης
-        print(f"Επιλογή Ημ. Έκδοσης: {row['d_i']}/{row['m_i']}/{row['y_i']}")
-        page.click("#issueDate")
-        pick_date_from_calendar(page, row['d_i'], row['m_i'], row['y_i'])
-        
-        # 2. Ημερομηνία Λήξης
-        print(f"Επιλογή Ημ. Λήξης: {row['d_e']}/{row['m_e']}/{row['y_e']}")
-        page.click("#expirationDate")
-        pick_date_from_calendar(page, row['d_e'], row['m_e'], row['y_e'])
-
-        # ---------------------------------------------------------
 
-        # 7. Upload Αρχείου
-        with page.expect_file_chooser() as fc:
-            page.click("text=Επιλογή Αρχείου")
-        fc.value.set_files(fpath)
-
-        # 8. Αποθήκευση
-        page.click("text=Αποθήκευση")
-        print("① Κλικ Αποθήκευση")
+    def update_health(self, data):
+        color = {"ok": "green", "αργή": "orange"}.get(data["state"], "red")
+        self.health_label.config(text=health_text(data), fg=color)
 
+    def run_agent(self):
+        # Τρέχει σε δικό του thread: καμία απευθείας κλήση Tk, μόνο γεγονότα στην ουρά
         try:
-            page.wait_for_selector('div.p-toast-detail:text("Η εγγραφή αποθηκεύτηκε επιτυχώς")', state='visible', timeout=15_000)
-            print("② Toast εμφανίστηκε")
-            time.sleep(2) 
+            self.engine.execute(self.submit_flag)
         except Exception as e:
-            print("② Toast ΔΕΝ εμφανίστηκε:", e)
-
-        # 9. Υποβολή
-        if submit:
-            submit_btn = page.locator('//button[contains(., "Υποβολή")]').first
-            submit_btn.scroll_into_view_if_needed()
-            time.sleep(0.5)
-            
-            if submit_btn.is_enabled():
-                submit_btn.click()
-                print("③ Κλικ Υποβολής")
-                try:
-                    page.wait_for_selector('//button[contains(., "Υποβολή") and @disabled]', timeout=10_000)
-                    print("④ Η Υποβολή καταχωρήθηκε")
-                except: pass
-                time.sleep(2)
-                page.screenshot(path=os.path.join(SCREEN_DIR, f"submitted_{doc}.png"))
-
-        # 10. Επιστροφή
-        try:
-            page.click('a[href="/dashboard/invoices/supporting-document/my-supporting-document"]', timeout=3_000)
-        except:
-            page.click('button:has-text("Επιστροφή")')
-            time.sleep(1)
-            if page.locator('button:has-text("Επιστροφή")').is_visible():
-                page.click('button:has-text("Επιστροφή")')
-        time.sleep(1)
+            self.events.put(("error", {"title": "Σφάλμα", "text": str(e)}))
+        finally:
+            self.events.put(("summary", {}))
 
     def fill_summary(self):
-        for name, reason in self.results:
-            if "ήδη" in reason:
-                self.summary_tree.insert("", "end", text=name, values=(reason,), tags=("info",))
-            else:
-                self.summary_tree.insert("", "end", text=name, values=(reason,), tags=("fail",))
-
-def pick_date_from_calendar(page, day, month, year):
-    page.wait_for_selector(".p-datepicker:visible")
-    calendar = page.locator(".p-datepicker:visible").last
-    
-    today = datetime.today()
-    max_p = today.replace(year=today.year-100)
-    max_f = today.replace(year=today.year+10)
-    tgt = datetime(year=year, month=month, day=1)
-    
-    if tgt < max_p or tgt > max_f:
-        raise RuntimeError(f"Ημερομηνία εκτός ορίων: {tgt.strftime('%d/%m/%Y')}")
-    
-    month_map = {"Ιανουάριος": 1, "Φεβρουάριος": 2, "Μάρτιος": 3, "Απρίλιος": 4,
-                 "Μάιος": 5, "Ιούνιος": 6, "Ιούλιος": 7, "Αύγουστος": 8,
-                 "Σεπτέμβριος": 9, "Οκτώβριος": 10, "Νοέμβριος": 11, "Δεκέμβριος": 12}
-    
-    while True:
-        hdr_text = calendar.locator(".p-datepicker-title").text_content()
-        if not hdr_text:
-            time.sleep(0.1)
-            continue
-            
-        hdr = hdr_text.strip().split()
-        if len(hdr) < 2:
-            time.sleep(0.1)
-            continue
-
-        c_y, c_m = int(hdr[1]), month_map[hdr[0]]
-        
-        if c_y == year and c_m == month:
-            break
-        
-        if tgt > datetime(year=c_y, month=c_m, day=1):
-            calendar.locator(".p-datepicker-next").click()
-        else:
-            calendar.locator(".p-datepicker-prev").click()
-        time.sleep(0.15)
-    
-    day_cell = calendar.locator(f"td:not(.p-disabled):not(.p-datepicker-other-month) >> text={int(day)}").first
-    if day_cell.count() == 0:
-        raise RuntimeError(f"Δεν βρέθηκε ενεργή μέρα {day}/{month}/{year}")
-    
-    day_cell.click()
-    time.sleep(0.5)
-
-def excel_date_to_parts(val):
-    if pd.isna(val):
-        today = datetime.today()
-        return today.day, today.month, today.year
-    if isinstance(val, (int, float)):
-        d = datetime(1899, 12, 30) + timedelta(days=int(val))
-    else:
-        d = pd.to_datetime(val)
-    return d.day, d.month, d.year
+        for name, reason, project in self.results:
+            self.summary_view.add(name, reason, "fail", project=project)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,2193 @@
+import os
+import sys
+import json
+import argparse
+import threading
+import time
+import queue
+import random
+import hashlib
+import io
+import gzip
+import tempfile
+import itertools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import namedtuple, deque
+from contextlib import contextmanager, redirect_stdout
+from urllib.parse import urlsplit
+import numpy as np
+import pandas as pd
+import openpyxl
+from datetime import datetime, timedelta
+from playwright.sync_api import sync_playwright
+import re
+
+# Προαιρετικά: συμπίεση εικόνων (Pillow) και PDF (pikepdf)
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+# Μέγιστη μνήμη διεργασίας (RSS) για τα στατιστικά φόρτωσης· δεν υπάρχει στα Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# -------------------------- ΡΥΘΜΙΣΕΙΣ --------------------------
+SCREEN_DIR = os.environ.get("OPSKE_SCREEN_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshots"))
+PROFILE_DIR = os.environ.get("OPSKE_LOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
+USERNAME = "USERNAME"
+PASSWORD = "PASSWORD"
+os.makedirs(SCREEN_DIR, exist_ok=True)
+
+ALLOWED_EXT = {'.pdf', '.jpg', '.jpeg', '.png'}
+MAX_SIZE_MB = 10
+
+# Έλεγχος περιεχομένου αρχείων: πραγματικός τύπος από τα πρώτα bytes και sha256
+MAGIC_BYTES = {"pdf": b"%PDF-", "jpeg": b"\xff\xd8\xff", "png": b"\x89PNG\r\n\x1a\n"}
+KIND_BY_EXT = {'.pdf': "pdf", '.jpg': "jpeg", '.jpeg': "jpeg", '.png': "png"}
+HASH_CHUNK = 1024 * 1024
+FILE_CHECK_WORKERS = 8
+# Ευρετήριο (sidecar) μέσα στον φάκελο: όνομα -> [size, mtime, τύπος, sha256]
+FILE_CACHE_NAME = ".opske_filecheck.json"
+
+# Προαιρετική συμπίεση μεγάλων σκαναρισμένων αρχείων πριν το upload (cache ανά sha256 στο temp)
+COMPRESS_DIR = os.path.join(tempfile.gettempdir(), "opske_compressed")
+COMPRESS_MIN_MB = 2
+COMPRESS_MAX_SIDE = 3508  # A4 στα 300 dpi
+COMPRESS_JPEG_QUALITY = 75
+COMPRESS_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Πύλη ΟΠΣΚΕ (μπορεί να δείξει σε τοπικό mock μέσω OPSKE_BASE_URL)
+BASE_URL = os.environ.get("OPSKE_BASE_URL", "https://app.opske.gr").rstrip("/")
+LIST_PATH = "/dashboard/invoices/supporting-document/my-supporting-document"
+LIST_URL = BASE_URL + LIST_PATH
+
+# Αποθηκευμένη συνεδρία ΑΑΔΕ (cookies/storage) για αποφυγή login σε κάθε εκτέλεση
+STATE_PATH = os.environ.get("OPSKE_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "auth_state.json"))
+SESSION_PROBE_TIMEOUT = 8_000
+_session_lock = threading.Lock()
+
+# Λογαριασμοί ΑΑΔΕ: ο προεπιλεγμένος ("") χρησιμοποιεί USERNAME/PASSWORD και STATE_PATH. Κάθε άλλος
+# διαβάζει OPSKE_USER_<ΟΝΟΜΑ>/OPSKE_PASS_<ΟΝΟΜΑ> και έχει δική του αποθηκευμένη συνεδρία και κλείδωμα
+DEFAULT_ACCOUNT = ""
+_session_locks = {}
+
+# Προφίλ ρυθμού: slow_mo και timeouts (ms) ορίζονται μόνο εδώ
+PACING_PROFILES = {
+    "safe":      {"slow_mo": 300, "timeout": 30_000, "nav_timeout": 10_000, "toast_timeout": 15_000},
+    "fast":      {"slow_mo": 50,  "timeout": 20_000, "nav_timeout": 10_000, "toast_timeout": 15_000},
+    "benchmark": {"slow_mo": 0,   "timeout": 10_000, "nav_timeout": 5_000,  "toast_timeout": 10_000},
+}
+DEFAULT_PACING = "safe"
+
+# Επιλογές των PrimeNG dropdown/multiselect της φόρμας
+OPTION_XPATH = "//li[@role='option']"
+
+# Μορφές ημερομηνίας στα πεδία #issueDate/#expirationDate (η πρώτη χρησιμοποιείται για πληκτρολόγηση)
+DATE_INPUT_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+# Γρήγορες διαδρομές που απέτυχαν σε αυτή τη συνεδρία, ώστε να μη δοκιμάζονται σε κάθε γραμμή
+_failed_date_paths = set()
+
+# Έλεγχος διπλοτύπων στην πύλη πριν το upload (μία σάρωση της λίστας, όλες οι σελίδες)
+PORTAL_DEDUP = True
+SCRAPE_MAX_PAGES = 500
+
+# Παράλληλα browser contexts (workers) για το upload
+DEFAULT_WORKERS = 1
+MAX_WORKERS = 8
+
+# Ιστορικό χρονομετρήσεων (logs/run_*.jsonl) για την εκτίμηση διάρκειας του dry-run
+ESTIMATE_HISTORY_RUNS = 20
+# Αύξων αριθμός εκτέλεσης στη διεργασία: μαζί με το pid ξεχωρίζει εκτελέσεις του ίδιου δευτερολέπτου
+_run_counter = itertools.count(1)
+
+# Νέες προσπάθειες ανά γραμμή σε παροδικά σφάλματα (εκθετική αναμονή με jitter, σε δευτερόλεπτα)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+
+# Προαιρετική δρομολόγηση αιτημάτων: off / block (εικόνες, fonts, media) / cache (στατικά αρχεία από τον δίσκο).
+# Analytics/trackers κόβονται σε κάθε λειτουργία εκτός από off.
+ASSET_MODES = ("off", "block", "cache")
+DEFAULT_ASSET_MODE = "off"
+ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_cache")
+ASSET_CACHE_MAX_AGE = 7 * 24 * 3600
+BLOCK_RESOURCE_TYPES = {"image", "font", "media"}
+CACHE_RESOURCE_TYPES = {"script", "stylesheet", "image", "font"}
+BLOCK_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "hotjar.com",
+               "clarity.ms", "facebook.net")
+# Headers που δεν ισχύουν πια για σώμα αποθηκευμένο αποσυμπιεσμένο
+ASSET_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# Αποδεικτικά υποβολής στο SCREEN_DIR: JPEG μόνο της φόρμας ή HTML (gzip), γραμμένα από thread στο παρασκήνιο,
+# με όνομα ανά γραμμή, dedup ανά sha256 (index.jsonl) και διαγραφή των παλαιότερων πάνω από το όριο χώρου
+EVIDENCE_MODES = ("screenshot", "html", "off")
+DEFAULT_EVIDENCE = "screenshot"
+EVIDENCE_SELECTOR = "form:visible, .p-card:visible"
+EVIDENCE_JPEG_QUALITY = 60
+EVIDENCE_TIMEOUT = 5_000
+EVIDENCE_MAX_MB = 500
+EVIDENCE_QUEUE_SIZE = 64
+EVIDENCE_INDEX = "index.jsonl"
+
+# Υγεία πύλης: κυλιόμενο παράθυρο δειγμάτων (χρόνος / timeout της φάσης) και ρύθμιση AIMD
+HEALTH_PHASES = {"save_toast": "toast_timeout", "open_form": "nav_timeout", "return": "nav_timeout", "recover": "nav_timeout"}
+HEALTH_WINDOW = 20
+HEALTH_MIN_SAMPLES = 5
+HEALTH_SLOW_RATIO = 0.4       # p90 πάνω από το 40% του timeout = αργή πύλη
+HEALTH_MAX_ERROR_RATE = 0.2
+HEALTH_COOLDOWN = 5           # δείγματα μεταξύ δύο μειώσεων
+HEALTH_INCREASE_EVERY = 10    # υγιή δείγματα ανά βήμα αύξησης
+HEALTH_DELAY_STEP = 1.0       # δευτερόλεπτα παύσης μεταξύ γραμμών ανά worker
+HEALTH_MAX_DELAY = 30.0
+
+# Στήλες Excel: απαραίτητες για τον έλεγχο και στήλες κατάστασης που γράφει ο agent
+REQUIRED_COLS = ["Επωνυμία – ΑΦΜ", "Κωδικός έργου", "Κωδικός Δικαιολογητικού",
+                 "Όνομα αρχείου", "Ημερομηνία έκδοσης δικαιολογητικού",
+                 "Ημερομηνία λήξης δικαιολογητικού", "Παρατηρήσεις ΟΠΣΚΕ"]
+STATUS_COLS = ["Αποθήκευση", "Υποβολή", "Ημ/νία & ώρα υποβολής"]
+
+# Ημερολόγιο (journal) ενημερώσεων κατάστασης δίπλα στο Excel και συχνότητα εγγραφής στο .xlsx
+JOURNAL_SUFFIX = ".journal.jsonl"
+JOURNAL_FLUSH_ROWS = 50
+
+# Σχήματα και βάρη για έλεγχο ΑΦΜ
+AFM_REGEX = r'^(.+) - (\d{9})$'
+AFM_WEIGHTS = [256, 128, 64, 32, 16, 8, 4, 2]
+
+# Αναγνωσμένα Excel ανά διαδρομή: (κλειδί mtime/μέγεθος, DataFrame)
+_excel_cache = {}
+_excel_cache_lock = threading.Lock()
+
+# Εγγραφή του ευρετηρίου φακέλου (size σε bytes, mtime σε δευτερόλεπτα)
+FileEntry = namedtuple("FileEntry", "path size mtime")
+# Αποτύπωμα αρχείου: τύπος από magic bytes (ή None), sha256, μήνυμα σφάλματος ανάγνωσης
+Fingerprint = namedtuple("Fingerprint", "kind sha256 error")
+# Γραμμή έτοιμη για upload (ο δείκτης είναι ο αρχικός του df)
+PreparedRow = namedtuple("PreparedRow", "index base_name project path row_dict")
+
+class FatalRowError(Exception):
+    # Σφάλμα που δεν διορθώνεται με νέα προσπάθεια: λάθος δεδομένα γραμμής ή η εγγραφή
+    # μπορεί να υπάρχει ήδη στην πύλη (saved=True όταν εμφανίστηκε το μήνυμα αποθήκευσης)
+    def __init__(self, message, saved=False):
+        super().__init__(message)
+        self.saved = saved
+
+# -------------------------- ENGINE --------------------------
+class UploadEngine:
+    # Έλεγχος και upload χωρίς εξάρτηση από GUI: η πρόοδος δημοσιεύεται ως γεγονότα (kind, data)
+    # σε όσους έχουν κάνει subscribe (GUI, CLI, αρχείο καταγραφής)
+    def __init__(self, excel_path=None, folder=None, workers=DEFAULT_WORKERS, pacing=DEFAULT_PACING, headless=False,
+                 compress=False, dry_run=False, retries=RETRY_ATTEMPTS, assets=DEFAULT_ASSET_MODE, pipeline=False,
+                 account=DEFAULT_ACCOUNT, evidence=DEFAULT_EVIDENCE, evidence_dir=SCREEN_DIR,
+                 evidence_mb=EVIDENCE_MAX_MB):
+        self.excel_path = excel_path
+        self.folder = folder
+        self.workers = workers
+        self.pacing = PACING_PROFILES[pacing]
+        self.headless = headless
+        self.compress = compress
+        self.dry_run = dry_run
+        self.retries = retries
+        self.assets = assets
+        self.pipeline = pipeline
+        self.account = account
+        self.evidence = evidence
+        self.evidence_dir = evidence_dir
+        self.evidence_mb = evidence_mb
+        self.play_flag = threading.Event()
+        self.play_flag.set()
+        self.results = []
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def emit(self, kind, **data):
+        for callback in self.subscribers:
+            callback(kind, data)
+
+    def validate_afm(self, afm):
+        if not afm.isdigit() or len(afm) != 9:
+            return False
+        digits = [int(d) for d in afm]
+        total = sum(d * w for d, w in zip(digits[:8], AFM_WEIGHTS))
+        remainder = total % 11
+        check_digit = 0 if remainder == 10 else remainder
+        return digits[8] == check_digit
+
+    def check_excel_structure(self, df):
+        GREEK_CHARS = 'α-ωά-ώΑ-ΩΆ-Ώ'
+        now = datetime.now()
+        row_num = pd.Series(df.index + 2, index=df.index).astype(str)
+
+        def text(col):
+            if col not in df.columns:
+                return pd.Series("", index=df.index, dtype=object)
+            return df[col].astype(object).map(str).str.strip()
+
+        def raw(col):
+            return df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+        def message(col, mask, body):
+            return ("Στήλη " + col + " (γραμμή " + row_num + "): " + body).where(mask)
+
+        file_name = text("Όνομα αρχείου")
+
+        # Στήλη A: "Επωνυμία - ΑΦΜ" και έλεγχος ψηφίου ΑΦΜ
+        afm_field = text("Επωνυμία – ΑΦΜ")
+        afm = afm_field.str.extract(AFM_REGEX)[1]
+        bad_format = afm.isna()
+        ok = ~bad_format
+        bad_afm = pd.Series(False, index=df.index)
+        bad_afm[ok] = ~afm_checksum_mask(afm[ok], self.validate_afm)
+        col_a = message("A", bad_format, "Λάθος format '" + afm_field + "'")
+        col_a = col_a.fillna(message("A", bad_afm, "Μη έγκυρο ΑΦΜ '" + afm.fillna("") + "'"))
+
+        # Στήλες B, C: κωδικοί έργου και δικαιολογητικού
+        project_code = text("Κωδικός έργου")
+        bad_project = ok & ~project_code.str.fullmatch(f'[a-zA-Z{GREEK_CHARS}0-9]+-\\d+')
+        col_b = message("B", bad_project, "Λάθος format '" + project_code + "'")
+        doc_code = text("Κωδικός Δικαιολογητικού")
+        bad_doc = ok & ~doc_code.str.fullmatch(r'\d{2}\.\d{2}')
+        col_c = message("C", bad_doc, "Λάθος format '" + doc_code + "'")
+
+        # Στήλες E, F: μία μετατροπή ανά στήλη ημερομηνίας
+        issue = date_check_codes(raw("Ημερομηνία έκδοσης δικαιολογητικού"), now, later_is_bad=True)
+        col_e = message("E", ok & (issue == 1), "Μη έγκυρη ημερομηνία")
+        col_e = col_e.fillna(message("E", ok & (issue == 2), "Ημερομηνία έκδοσης μεταγενέστερη από σήμερα"))
+        expiry = date_check_codes(raw("Ημερομηνία λήξης δικαιολογητικού"), now, later_is_bad=False)
+        col_f = message("F", ok & (expiry == 1), "Μη έγκυρη ημερομηνία")
+        col_f = col_f.fillna(message("F", ok & (expiry == 2), "Ημερομηνία λήξης προγενέστερη από σήμερα"))
+
+        # Σειρά σφαλμάτων: ανά γραμμή και μέσα στη γραμμή A, B, C, E, F
+        table = pd.concat([col_a, col_b, col_c, col_e, col_f], axis=1).to_numpy(dtype=object)
+        rows, cols = np.nonzero(pd.notna(table))
+        names = file_name.to_numpy(dtype=object)
+        return list(zip(names[rows].tolist(), table[rows, cols].tolist()))
+
+    def check(self):
+        self.ok_count = 0
+        self.problem_count = 0
+        
+        try:
+            df, stats = load_excel(self.excel_path)
+            self.emit("info", text=load_stats_text(stats))
+            missing_cols = [col for col in REQUIRED_COLS if col not in df.columns]
+            if missing_cols:
+                self.emit("error", title="Σφάλμα Excel", text=f"Λείπουν οι στήλες: {', '.join(missing_cols)}")
+                return False
+        except Exception as e:
+            self.emit("error", title="Σφάλμα", text=f"Δεν μπόρεσε να διαβαστεί το Excel: {e}")
+            return False
+        
+        try:
+            index, duplicates = build_folder_index(self.folder)
+        except OSError as e:
+            self.emit("error", title="Σφάλμα", text=f"Δεν μπόρεσε να διαβαστεί ο φάκελος: {e}")
+            return False
+
+        names = df["Όνομα αρχείου"].astype(object).map(str).str.strip()
+        self.validate_entries({n: index[n] for n in names if n in index and n not in duplicates})
+
+        excel_errors = self.check_excel_structure(df)
+        projects = dict(zip(df["Όνομα αρχείου"].astype(object).map(str).str.strip(),
+                            df["Κωδικός έργου"].astype(object).map(str).str.strip()))
+        for file_name, error_msg in excel_errors:
+            self.problem_count += 1
+            self.emit("check", name=file_name, status="Σφάλμα Excel ✗", ok=False, reason=error_msg,
+                      project=projects.get(file_name, ""))
+        
+        for idx, row in df.iterrows():
+            fname = str(row["Όνομα αρχείου"]).strip()
+            if not fname or fname == 'nan':
+                continue
+            project = str(row["Κωδικός έργου"]).strip()
+            
+            entry = index.get(fname)
+            if fname in duplicates:
+                self.problem_count += 1
+                reason = duplicate_reason(fname, duplicates[fname])
+                self.emit("check", name=fname, status="Διπλότυπο ✗", ok=False, reason=reason, project=project)
+            elif entry is not None:
+                ok, reason = self.file_checks[fname]
+                if ok:
+                    self.ok_count += 1
+                    self.emit("check", name=fname, status="Βρέθηκε ✓", ok=True, reason=None, project=project)
+                else:
+                    self.problem_count += 1
+                    self.emit("check", name=fname, status="Σφάλμα ✗", ok=False, reason=reason, project=project)
+            else:
+                self.problem_count += 1
+                reason = f"Δεν βρέθηκε αρχείο με το όνομα: {fname}"
+                self.emit("check", name=fname, status="Δεν βρέθηκε ✗", ok=False, reason=reason, project=project)
+        
+        # Ίδιο περιεχόμενο κάτω από διαφορετικά ονόματα: προειδοποίηση, όχι σφάλμα
+        for group in content_duplicates(self.fingerprints):
+            self.emit("info", text=f"Ίδιο περιεχόμενο σε {len(group)} αρχεία: {', '.join(group)}")
+
+        passed = (self.ok_count > 0 and len(excel_errors) == 0)
+        
+        if passed:
+            if self.problem_count == 0:
+                msg = "Έλεγχος ολοκληρώθηκε με επιτυχία! Όλα είναι ΟΚ."
+            else:
+                msg = f"Έλεγχος ολοκληρώθηκε! Βρέθηκαν {self.ok_count} αρχεία ΟΚ και {self.problem_count} προβλήματα. Θα επεξεργαστούν μόνο τα ΟΚ."
+        else:
+            if excel_errors:
+                msg = f"Ο έλεγχος βρήκε {len(excel_errors)} σφάλματα στο Excel και {self.problem_count} προβλήματα στα αρχεία. Διορθώστε όλα τα σφάλματα!"
+            else:
+                msg = "Ο έλεγχος βρήκε προβλήματα σε όλα τα αρχεία. Διορθώστε τα πριν συνεχίσετε!"
+        self.emit("check_done", passed=passed, text=msg)
+        return passed
+
+    def validate_file(self, fpath, size=None, fingerprint=None, max_mb=MAX_SIZE_MB):
+        ext = os.path.splitext(fpath)[1].lower().strip()
+        if ext not in ALLOWED_EXT:
+            return False, f"Μη επιτρεπτή επέκταση: '{ext}' (επιτρέπονται: {', '.join(sorted(ALLOWED_EXT))})"
+        if size is None:
+            size = os.path.getsize(fpath)
+        size = size / (1024*1024)
+        if size > max_mb:
+            return False, f"Υπέρβαση μεγέθους: {size:.2f} MB"
+        if fingerprint is None:
+            fingerprint = fingerprint_file(fpath)
+        if fingerprint.error:
+            return False, f"Δεν διαβάστηκε το αρχείο: {fingerprint.error}"
+        if fingerprint.kind is None:
+            return False, "Το περιεχόμενο δεν είναι PDF/JPEG/PNG"
+        if fingerprint.kind != KIND_BY_EXT[ext]:
+            return False, f"Η επέκταση '{ext}' δεν ταιριάζει με το περιεχόμενο ({fingerprint.kind.upper()})"
+        return True, None
+
+    def validate_entries(self, entries):
+        # entries: όνομα -> FileEntry. Αποτυπώματα παράλληλα και από το sidecar, μετά ο έλεγχος κάθε αρχείου
+        allowed = {base: e for base, e in entries.items() if os.path.splitext(e.path)[1].lower() in ALLOWED_EXT}
+        self.fingerprints = fingerprint_files(self.folder, allowed)
+        # Με ενεργή συμπίεση το όριο μεγέθους ελέγχεται ξανά πάνω στο συμπιεσμένο αρχείο
+        self.file_checks = {base: self.validate_file(e.path, e.size, self.fingerprints.get(base),
+                                                     float("inf") if self.compressible(base, e) else MAX_SIZE_MB)
+                            for base, e in entries.items()}
+        return self.file_checks
+
+    def compressible(self, base, entry):
+        if not self.compress or entry.size <= COMPRESS_MIN_MB * 1024 * 1024:
+            return False
+        fp = self.fingerprints.get(base)
+        ext = os.path.splitext(entry.path)[1].lower()
+        return bool(fp and fp.sha256 and fp.kind == KIND_BY_EXT.get(ext) and can_compress(fp.kind))
+
+    def start_compression(self, names):
+        # Τα μεγάλα αρχεία μπαίνουν στο process pool με τη σειρά των γραμμών,
+        # ώστε οι επόμενες να είναι έτοιμες όσο ανεβαίνει η τρέχουσα
+        if not self.compress:
+            return None
+        if Image is None:
+            self.emit("info", text="Η συμπίεση χρειάζεται Pillow (και pikepdf για PDF) - τα αρχεία ανεβαίνουν ως έχουν")
+            return None
+        pool = None
+        for base in names:
+            entry = self.folder_index.get(base)
+            if entry is None or base in self.folder_duplicates or base in self.compressed or not self.compressible(base, entry):
+                continue
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=COMPRESS_WORKERS)
+            out_dir = os.path.join(COMPRESS_DIR, self.fingerprints[base].sha256[:16])
+            self.compressed[base] = pool.submit(compress_file, entry.path, out_dir)
+        return pool
+
+    def compressed_file(self, base, entry):
+        # (διαδρομή, μέγεθος, αποτύπωμα) του αρχείου που θα ανέβει: το συμπιεσμένο αν βγήκε μικρότερο
+        future = self.compressed.get(base)
+        out = None
+        if future is not None:
+            try:
+                out = future.result()
+            except Exception as e:
+                print(f"⚠️ Η συμπίεση του {base} απέτυχε: {e}")
+        if out is None:
+            return entry.path, entry.size, self.fingerprints.get(base)
+        with self.run_lock:
+            self.compress_stats[0] += 1
+            self.compress_stats[1] += entry.size
+            self.compress_stats[2] += out[1]
+        return out[0], out[1], None
+
+    # Οι τρέχουσες γραμμές ξεχωρίζουν με τον δείκτη της γραμμής: δύο γραμμές μπορεί να έχουν ίδιο αρχείο
+    def add_current(self, index, name):
+        self.emit("current", row=index, name=name, progress=0)
+
+    def update_progress(self, index, name, val):
+        self.emit("current", row=index, name=name, progress=val)
+
+    def remove_current(self, index, name):
+        self.emit("current_done", row=index, name=name)
+
+    # self.results: (όνομα, αιτία, ok) για αποτυχίες (ok=False) και γραμμές που δεν χρειάστηκαν δουλειά (ok=True)
+    def add_result(self, name, ok, reason="", project=""):
+        if not ok:
+            self.results.append((name, reason, False))
+        self.emit("result", name=name, ok=ok, reason=reason, project=project)
+
+    def add_skipped(self, name, reason, project=""):
+        self.results.append((name, reason, True))
+        self.emit("skipped", name=name, reason=reason, project=project)
+
+    def failed_rows(self):
+        return [name for name, reason, ok in self.results if not ok]
+
+    def update_total_progress(self, current, total):
+        self.emit("progress", current=current, total=total)
+
+    def execute(self, submit=False):
+        self.results = []
+        if self.dry_run:
+            try:
+                self.plan(submit)
+            finally:
+                self.emit("finished", results=list(self.results))
+            return
+        with sync_playwright() as pw:
+            try:
+                self.run(pw, submit)
+            finally:
+                self.emit("finished", results=list(self.results))
+
+    def plan(self, submit=False):
+        # Dry-run: η σειρά που θα ακολουθούσε η εκτέλεση και εκτίμηση διάρκειας, χωρίς browser
+        # και χωρίς εγγραφή στο Excel (το ημερολόγιο εφαρμόζεται μόνο στη μνήμη)
+        df, stats = load_excel(self.excel_path)
+        print(load_stats_text(stats))
+        for col in STATUS_COLS:
+            if col not in df.columns:
+                df[col] = ""
+        replay_journal(self.excel_path, df)
+        to_process = self.pending_rows(df, submit)
+        if to_process is None:
+            return
+        workers = max(1, min(self.workers, MAX_WORKERS, len(to_process)))
+        lanes = schedule_rows(to_process, workers)
+        groups = row_groups(to_process)
+        for lane_no, lane in enumerate(lanes, 1):
+            self.emit("info", text=f"Worker {lane_no}: {len(lane)} γραμμές, {groups.loc[lane].nunique()} ομάδες ΑΦΜ/έργου")
+            for pos, index in enumerate(lane, 1):
+                row = to_process.loc[index]
+                self.emit("info", text=f"  {pos}. γραμμή {index + 2}: {str(row['Όνομα αρχείου']).strip()} "
+                                       f"({groups[index][0]} / {str(row['Κωδικός έργου']).strip()})")
+        estimate = estimate_duration([len(lane) for lane in lanes])
+        if estimate is None:
+            self.emit("info", text="Εκτίμηση διάρκειας: δεν υπάρχουν χρονομετρήσεις προηγούμενων εκτελέσεων")
+        else:
+            seconds, runs = estimate
+            self.emit("info", text=f"Εκτίμηση διάρκειας: ~{timedelta(seconds=round(seconds))} "
+                                   f"(από {runs} προηγούμενες εκτελέσεις)")
+
+    def run(self, playwright, submit=False):
+        df, stats = load_excel(self.excel_path)
+        print(load_stats_text(stats))
+        if "Αποθήκευση" not in df.columns: df["Αποθήκευση"] = ""
+        if "Υποβολή" not in df.columns: df["Υποβολή"] = ""
+        # Προσθήκη νέας στήλης
+        if "Ημ/νία & ώρα υποβολής" not in df.columns: 
+            df["Ημ/νία & ώρα υποβολής"] = ""
+
+        kept = replay_into_workbook(self.excel_path, df)
+        to_process = self.pending_rows(df, submit)
+        if to_process is None:
+            return
+
+        # Ένα πέρασμα στον φάκελο για όλες τις γραμμές
+        self.folder_index, self.folder_duplicates = build_folder_index(self.folder)
+        names = to_process["Όνομα αρχείου"].astype(object).map(str).str.strip()
+        self.validate_entries({n: self.folder_index[n] for n in names
+                               if n in self.folder_index and n not in self.folder_duplicates})
+
+        self.run_lock = threading.Lock()
+        self.done_count = 0
+        self.worker_errors = []
+        self.journal = StatusJournal(self.excel_path, pending=kept)
+        self.profiler = RunProfiler()
+        jobs = RowScheduler([])
+        pool = None
+        self.option_cache = {}
+        self.router = AssetRouter(self.assets)
+        self.evidence_writer = EvidenceWriter(self.evidence_dir, self.evidence_mb) if self.evidence != "off" else None
+        self.retry_count = 0
+        self.compressed = {}
+        self.compress_stats = [0, 0, 0]  # αρχεία, bytes πριν, bytes μετά
+
+        try:
+            if PORTAL_DEDUP and len(to_process):
+                to_process = self.skip_portal_duplicates(playwright, df, to_process, submit)
+            total = len(to_process)
+            self.update_total_progress(0, total)
+
+            # Γραμμές ομαδοποιημένες ανά ΑΦΜ/έργο, μία λωρίδα ανά worker (ο δείκτης df μένει ο αρχικός)
+            workers = max(1, min(self.workers, MAX_WORKERS, total))
+            self.health = PortalHealth(workers, self.pacing, self.emit)
+            self.profiler.listener = self.health.observe
+            lanes = schedule_rows(to_process, workers)
+            rows = dict(to_process.iterrows())
+            jobs = RowScheduler([[(index, rows[index]) for index in lane] for lane in lanes])
+            names = to_process["Όνομα αρχείου"].astype(object).map(str).str.strip()
+            pool = self.start_compression(names.loc[interleave(lanes)])
+
+            if workers == 1:
+                self.worker_loop(playwright, jobs, df, submit, total)
+            else:
+                threads = [threading.Thread(target=self.run_worker, args=(jobs, df, submit, total, lane), daemon=True)
+                           for lane in range(workers)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            self.flush_status(df)
+            self.journal.close()
+            self.profiler.close()
+            for line in self.profiler.summary():
+                self.emit("info", text=line)
+            if self.retry_count:
+                self.emit("info", text=f"Νέες προσπάθειες: {self.retry_count}")
+            if self.router.mode != "off":
+                self.emit("info", text=self.router.report())
+            if self.evidence_writer is not None:
+                self.evidence_writer.close()
+                if self.evidence_writer.stats["captures"]:
+                    self.emit("info", text=self.evidence_writer.report())
+            count, before, after = self.compress_stats
+            if count:
+                self.emit("info", text=f"Συμπίεση: {count} αρχεία, {before / 1048576:.1f} MB → {after / 1048576:.1f} MB")
+
+        if not jobs.empty() and self.worker_errors:
+            raise RuntimeError(f"Έμειναν {jobs.qsize()} γραμμές χωρίς επεξεργασία: {self.worker_errors[0]}")
+
+    def pending_rows(self, df, submit):
+        # Γραμμές που μένουν για επεξεργασία· όσες έχουν ήδη αποθηκευτεί/υποβληθεί αναφέρονται ως παραλειπόμενες
+        skip_indices = []
+        for idx, row in df.iterrows():
+            fname = str(row["Όνομα αρχείου"]).strip()
+            if not fname or fname == 'nan':
+                skip_indices.append(idx)
+                continue
+            
+            h_val = str(row.get("Αποθήκευση", "")).strip().upper()
+            i_val = str(row.get("Υποβολή", "")).strip().upper()
+            
+            if i_val == "TRUE":
+                self.add_skipped(fname, "Το αρχείο είχε υποβληθεί ήδη!", str(row["Κωδικός έργου"]).strip())
+                skip_indices.append(idx)
+            elif h_val == "TRUE" and not submit:
+                self.add_skipped(fname, "Το αρχείο είχε αποθηκευτεί ήδη!", str(row["Κωδικός έργου"]).strip())
+                skip_indices.append(idx)
+
+        if submit:
+            mask = df["Υποβολή"].astype(str).str.strip().str.upper() == "TRUE"
+        else:
+            h_mask = df["Αποθήκευση"].astype(str).str.strip().str.upper() == "TRUE"
+            i_mask = df["Υποβολή"].astype(str).str.strip().str.upper() == "TRUE"
+            mask = h_mask | i_mask
+
+        if mask.all():
+            msg = "Όλα τα δικαιολογητικά έχουν υποβληθεί" if submit else "Όλα τα δικαιολογητικά έχουν αποθηκευτεί/υποβληθεί"
+            self.emit("info", text=msg)
+            return None
+
+        to_process = df[~mask].copy()
+        return to_process
+
+    def run_worker(self, jobs, df, submit, total, lane=0):
+        # Κάθε worker έχει δικό του Playwright/browser (το sync API δεν μοιράζεται μεταξύ threads)
+        with sync_playwright() as pw:
+            try:
+                self.worker_loop(pw, jobs, df, submit, total, lane)
+            except Exception as e:
+                print(f"Σφάλμα worker: {e}")
+                with self.run_lock:
+                    self.worker_errors.append(str(e))
+
+    def launch_browser(self, playwright):
+        # Σε headless λειτουργία δεν χρειάζεται επιβράδυνση για ανθρώπινη παρακολούθηση
+        slow_mo = 0 if self.headless else self.pacing["slow_mo"]
+        return playwright.chromium.launch(headless=self.headless, slow_mo=slow_mo)
+
+    def skip_portal_duplicates(self, playwright, df, to_process, submit):
+        # Γραμμές που υπάρχουν ήδη στην πύλη δεν ξανανεβαίνουν· η κατάστασή τους περνά στο Excel
+        browser = self.launch_browser(playwright)
+        try:
+            with self.profiler.span("", "login"):
+                context, page = open_session(browser, self.router, self.account)
+            page.set_default_timeout(self.pacing["timeout"])
+            with self.profiler.span("", "portal_scan"):
+                portal = scrape_portal_documents(page)
+        except Exception as e:
+            print(f"Η σάρωση της πύλης απέτυχε ({e}) - συνέχεια χωρίς έλεγχο διπλοτύπων")
+            return to_process
+        finally:
+            browser.close()
+        if portal is None:
+            return to_process
+
+        keep = []
+        for index, row in to_process.iterrows():
+            status = portal_lookup(portal, row)
+            if status is None:
+                keep.append(index)
+                continue
+            fname = str(row["Όνομα αρχείου"]).strip()
+            project = str(row["Κωδικός έργου"]).strip()
+            submitted = "Υποβ" in status
+            values = {"Αποθήκευση": "TRUE", "Υποβολή": "TRUE" if submitted else "FALSE"}
+            with self.run_lock:
+                self.journal.append(index, fname, values)
+                for col, value in values.items():
+                    df.loc[index, col] = value
+            if submitted or not submit:
+                self.add_skipped(fname, "Το αρχείο υπάρχει ήδη στο ΟΠΣΚΕ!", project)
+            else:
+                # Πρόχειρο στην πύλη: νέο upload θα έφτιαχνε διπλότυπο, άρα η γραμμή μένει αποτυχημένη
+                # μέχρι να υποβληθεί το υπάρχον από την πύλη
+                self.add_result(fname, False, "Αποθηκευμένο στο ΟΠΣΚΕ χωρίς υποβολή - υποβάλετε το υπάρχον πρόχειρο από την πύλη", project)
+        print(f"Έλεγχος πύλης: {len(to_process) - len(keep)} γραμμές υπάρχουν ήδη στο ΟΠΣΚΕ")
+        return to_process.loc[keep]
+
+    def worker_loop(self, playwright, jobs, df, submit, total, lane=0):
+        browser = self.launch_browser(playwright)
+        try:
+            with self.profiler.span("", "login"):
+                context, page = open_session(browser, self.router, self.account)
+            page.set_default_timeout(self.pacing["timeout"])
+            if self.pipeline:
+                self.pipeline_loop(context, page, jobs, df, submit, total, lane)
+                return
+
+            while True:
+                try:
+                    index, row = jobs.get(lane)
+                except queue.Empty:
+                    break
+                self.play_flag.wait()
+                self.health.acquire()
+                try:
+                    with self.profiler.span(str(row["Όνομα αρχείου"]).strip(), "row"):
+                        self.process_row(page, df, index, row, submit)
+                finally:
+                    self.health.release()
+                with self.run_lock:
+                    self.done_count += 1
+                    done = self.done_count
+                self.update_total_progress(done, total)
+                self.health.pause()
+        finally:
+            browser.close()
+
+    def pipeline_loop(self, context, page, jobs, df, submit, total, lane=0):
+        # Δύο καρτέλες: όσο η τρέχουσα περιμένει την πύλη (toast/υποβολή), η δεύτερη φορτώνει τη λίστα
+        # και ανοίγει ήδη την επόμενη φόρμα· η προετοιμασία της επόμενης γραμμής τρέχει σε δικό της thread
+        spare = context.new_page()
+        spare.set_default_timeout(self.pacing["timeout"])
+        form_open = False
+        with ThreadPoolExecutor(max_workers=1) as prep:
+            upcoming = self.prefetch_row(jobs, lane, prep)
+            while upcoming is not None:
+                index, row, future = upcoming
+                self.play_flag.wait()
+                self.health.acquire()
+                try:
+                    with self.profiler.span(str(row["Όνομα αρχείου"]).strip(), "row"):
+                        upcoming = self.prefetch_row(jobs, lane, prep)
+                        prepared = future.result()
+                        if prepared is not None:
+                            ok = self.upload_prepared(page, df, prepared, submit, spare=spare, form_open=form_open)
+                            form_open = False
+                            if ok:
+                                # Η επόμενη γραμμή συνεχίζει στη δεύτερη καρτέλα, με τη φόρμα να ανοίγει ήδη
+                                page, spare = spare, page
+                                form_open = open_form_ahead(page, self.pacing["nav_timeout"], self.account)
+                finally:
+                    self.health.release()
+                with self.run_lock:
+                    self.done_count += 1
+                    done = self.done_count
+                self.update_total_progress(done, total)
+                self.health.pause()
+
+    def prefetch_row(self, jobs, lane, prep):
+        try:
+            index, row = jobs.get(lane)
+        except queue.Empty:
+            return None
+        return index, row, prep.submit(self.prepare_row, index, row)
+
+    def process_row(self, page, df, index, row, submit):
+        prepared = self.prepare_row(index, row)
+        if prepared is not None:
+            self.upload_prepared(page, df, prepared, submit)
+
+    def prepare_row(self, index, row):
+        # Ό,τι δεν χρειάζεται browser: αρχείο (και συμπίεση), έλεγχος, ημερομηνίες. None αν η γραμμή απέτυχε.
+        base_name = str(row["Όνομα αρχείου"]).strip()
+        project = str(row["Κωδικός έργου"]).strip()
+
+        if base_name in self.folder_duplicates:
+            self.add_result(base_name, False, duplicate_reason(base_name, self.folder_duplicates[base_name]), project=project)
+            return None
+        entry = self.folder_index.get(base_name)
+        if entry is None:
+            self.add_result(base_name, False, f"Δεν βρέθηκε αρχείο με όνομα: {base_name}", project=project)
+            return None
+
+        if base_name in self.compressed:
+            with self.profiler.span(base_name, "compress"):
+                real_path, size, fingerprint = self.compressed_file(base_name, entry)
+            ok, reason = self.validate_file(real_path, size, fingerprint)
+        else:
+            real_path = entry.path
+            ok, reason = self.file_checks.get(base_name) or self.validate_file(real_path, entry.size)
+        if not ok:
+            self.add_result(base_name, False, reason, project=project)
+            return None
+
+        try:
+            d_i, m_i, y_i = excel_date_to_parts(row["Ημερομηνία έκδοσης δικαιολογητικού"])
+            d_e, m_e, y_e = excel_date_to_parts(row["Ημερομηνία λήξης δικαιολογητικού"])
+        except Exception as e:
+            self.add_result(base_name, False, f"Μη έγκυρη ημερομηνία: {e}", project=project)
+            return None
+
+        row_dict = {
+            "ben": row["Επωνυμία – ΑΦΜ"],
+            "app": row["Κωδικός έργου"],
+            "doc": row["Κωδικός Δικαιολογητικού"],
+            "note": row["Παρατηρήσεις ΟΠΣΚΕ"],
+            "d_i": d_i, "m_i": m_i, "y_i": y_i,
+            "d_e": d_e, "m_e": m_e, "y_e": y_e,
+            "fname": row["Όνομα αρχείου"]
+        }
+        return PreparedRow(index, base_name, project, real_path, row_dict)
+
+    def upload_prepared(self, page, df, prepared, submit, spare=None, form_open=False):
+        # Upload με νέες προσπάθειες· True αν η γραμμή ολοκληρώθηκε
+        index, base_name, project, real_path, row_dict = prepared
+        self.add_current(index, base_name)
+        self.update_progress(index, base_name, 10)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Μόνο η πρώτη προσπάθεια βρίσκει τη φόρμα ήδη ανοιχτή
+                self.upload_row(page, row_dict, real_path, submit, spare=spare, form_open=form_open and attempt == 1)
+                break
+            except Exception as e:
+                retry = attempt < self.retries and is_retryable(e)
+                if not retry:
+                    self.remove_current(index, base_name)
+                    self.add_result(base_name, False, str(e), project=project)
+                    print(f"Σφάλμα στο αρχείο {base_name}: {e}")
+                    if getattr(e, "saved", False):
+                        # Αποθηκεύτηκε στην πύλη αλλά δεν υποβλήθηκε: να μην ξανανέβει ως νέα εγγραφή
+                        self.record_status(df, index, base_name, submitted=False)
+                else:
+                    delay = backoff_delay(attempt)
+                    with self.run_lock:
+                        self.retry_count += 1
+                    print(f"Σφάλμα στο αρχείο {base_name} (προσπάθεια {attempt}/{self.retries}): {e} - νέα προσπάθεια σε {delay:.1f} s")
+                try:
+                    with self.profiler.span(base_name, "recover"):
+                        recover_list_view(page, self.pacing["nav_timeout"], self.account)
+                except Exception as re_err:
+                    print(f"Η επαναφορά στη λίστα απέτυχε: {re_err}")
+                if not retry:
+                    return False
+                time.sleep(delay)
+
+        self.remove_current(index, base_name)
+        self.add_result(base_name, True, project=project)
+        self.record_status(df, index, base_name, submitted=submit)
+        return True
+
+    def record_status(self, df, index, base_name, submitted):
+        # Ενημέρωση Excel: πρώτα στο ημερολόγιο, μετά στο κοινό DataFrame
+        now_str = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        values = {"Αποθήκευση": "TRUE", "Υποβολή": "TRUE" if submitted else "FALSE", "Ημ/νία & ώρα υποβολής": now_str}
+        with self.run_lock:
+            pending = self.journal.append(index, base_name, values)
+            for col, value in values.items():
+                df.loc[index, col] = value
+        if pending >= JOURNAL_FLUSH_ROWS:
+            self.flush_status(df)
+
+    def flush_status(self, df):
+        # Μία εγγραφή του .xlsx για όλες τις εκκρεμείς γραμμές· αν αποτύχει, το ημερολόγιο μένει
+        with self.run_lock:
+            if not self.journal.pending:
+                return
+            try:
+                write_status_columns(self.excel_path, df)
+            except Exception as e:
+                print(f"Η εγγραφή στο Excel απέτυχε ({e}) - οι ενημερώσεις παραμένουν στο ημερολόγιο")
+                return
+            self.journal.truncate()
+
+    def choose_option(self, page, kind, value, match):
+        # Η επιλογή που ταίριαξε για (kind, value) μένει στη μνήμη για όλη την εκτέλεση:
+        # οι επόμενες γραμμές της ίδιας εταιρείας/έργου κάνουν κλικ κατευθείαν στην ετικέτα
+        options = page.locator(OPTION_XPATH)
+        label = self.option_cache.get((kind, value))
+        if label is not None:
+            try:
+                options.filter(has_text=re.compile(rf"^\s*{re.escape(label)}\s*$")).first.click(timeout=self.pacing["nav_timeout"])
+                return label
+            except Exception:
+                self.option_cache.pop((kind, value), None)
+        options.first.wait_for(state="visible", timeout=self.pacing["nav_timeout"])
+        for i, text in enumerate(option_texts(page)):
+            if match(text):
+                options.nth(i).click()
+                self.option_cache[(kind, value)] = text
+                return text
+        raise FatalRowError(f"Δεν βρέθηκε στη λίστα της πύλης: {value[-1] if isinstance(value, tuple) else value}")
+
+    def capture_evidence(self, page, row, key):
+        # Στο thread της σελίδας γίνεται μόνο η λήψη· hash, συμπίεση και εγγραφή στο EvidenceWriter
+        if self.evidence_writer is None:
+            return
+        try:
+            with self.profiler.span(key, "evidence"):
+                if self.evidence == "html":
+                    data = page.content().encode("utf-8")
+                else:
+                    data = evidence_screenshot(page)
+        except Exception as e:
+            print(f"Αποτυχία λήψης αποδεικτικού: {e}")
+            return
+        self.evidence_writer.put(evidence_key(row), self.evidence, data)
+
+    def upload_row(self, page, row, fpath, submit=False, spare=None, form_open=False):
+        ben = str(row["ben"]).strip()
+        app = str(row["app"]).strip()
+        doc = str(row["doc"]).strip()
+        note = str(row["note"]).strip()
+        key = str(row["fname"]).strip()
+        span = self.profiler.span
+        nav_timeout = self.pacing["nav_timeout"]
+
+        # 1. Κλικ Προσθήκη (σε pipeline το κλικ έχει γίνει ήδη από την προηγούμενη γραμμή)
+        with span(key, "open_form"):
+            if not form_open:
+                try:
+                    page.wait_for_selector("text=Προσθήκη", state="visible", timeout=nav_timeout)
+                    page.click("text=Προσθήκη")
+                except Exception as e:
+                    raise RuntimeError(f"Δεν βρέθηκε το κουμπί Προσθήκη: {e}") from e
+
+            # Η φόρμα είναι έτοιμη όταν εμφανιστεί το πρώτο dropdown
+            page.wait_for_selector("(//span[@role='combobox'])[1]", state="visible", timeout=nav_timeout)
+
+        # 2-5. Dropdowns & Comments
+        with span(key, "dropdown_beneficiary"):
+            page.click("(//span[@role='combobox'])[1]")
+            flt = ben[:6]
+            suf = ben[-3:]
+            page.fill("//input[contains(@class,'p-dropdown-filter')]", flt)
+            self.choose_option(page, "ben", ben, lambda text: suf in text)
+
+        with span(key, "dropdown_project"):
+            page.click("div.p-multiselect-label-container")
+            self.choose_option(page, "app", (ben, app), lambda text: app.upper() in text.upper())
+            page.click("body")
+
+        with span(key, "dropdown_document"):
+            page.click("(//span[@role='combobox'])[2]")
+            page.fill("//input[contains(@class,'p-dropdown-filter')]", doc[:5])
+            self.choose_option(page, "doc", doc, lambda text: True)
+
+        page.fill("#comments", note)
+
+        # ---------------------------------------------------------
+        # ΗΜΕΡΟΜΗΝΙΕΣ: ΠΛΗΚΤΡΟΛΟΓΗΣΗ -> ΕΠΙΛΟΓΗ ΕΤΟΥΣ/ΜΗΝΑ -> ΗΜΕΡΟΛΟΓΙΟ
+        # ---------------------------------------------------------
+        
+        # 1. Ημερομηνία Έκδοσης
+        print(f"Επιλογή Ημ. Έκδοσης: {row['d_i']}/{row['m_i']}/{row['y_i']}")
+        with span(key, "date_issue"):
+            set_date(page, "#issueDate", row['d_i'], row['m_i'], row['y_i'])
+        
+        # 2. Ημερομηνία Λήξης
+        print(f"Επιλογή Ημ. Λήξης: {row['d_e']}/{row['m_e']}/{row['y_e']}")
+        with span(key, "date_expiry"):
+            set_date(page, "#expirationDate", row['d_e'], row['m_e'], row['y_e'])
+
+        # ---------------------------------------------------------
+
+        # 7. Upload Αρχείου
+        with span(key, "file_upload"):
+            with page.expect_file_chooser() as fc:
+                page.click("text=Επιλογή Αρχείου")
+            fc.value.set_files(fpath)
+
+        # 8. Αποθήκευση
+        page.click("text=Αποθήκευση")
+        print("① Κλικ Αποθήκευση")
+        if spare is not None:
+            # Η λίστα φορτώνει στη δεύτερη καρτέλα όσο η πύλη επεξεργάζεται την αποθήκευση
+            preload_list(spare, nav_timeout)
+
+        # Μετά το κλικ η εγγραφή μπορεί να υπάρχει ήδη στην πύλη: κανένα σφάλμα από εδώ δεν ξαναδοκιμάζεται
+        saved = False
+        try:
+            # Το span τροφοδοτεί το PortalHealth: μόνο η αναμονή του toast, και το timeout μετρά ως σφάλμα
+            try:
+                with span(key, "save_toast"):
+                    page.wait_for_selector('div.p-toast-detail:text("Η εγγραφή αποθηκεύτηκε επιτυχώς")', state='visible', timeout=self.pacing["toast_timeout"])
+            except Exception as e:
+                print("② Toast ΔΕΝ εμφανίστηκε:", e)
+                # Άγνωστο αν η εγγραφή έφτασε στην πύλη: ούτε νέα προσπάθεια ούτε σήμανση στο Excel
+                raise FatalRowError("Δεν επιβεβαιώθηκε η αποθήκευση (χωρίς μήνυμα επιτυχίας) - ελέγξτε την πύλη") from e
+            print("② Toast εμφανίστηκε")
+            saved = True
+            # Χωρίς αναμονή για networkidle (το Angular μπορεί να κάνει polling): η υποβολή περιμένει
+            # το ενεργό κουμπί και η επιστροφή τη λίστα
+
+            # 9. Υποβολή
+            if submit:
+                with span(key, "submit"):
+                    submit_btn = page.locator('//button[contains(., "Υποβολή")]').first
+                    submit_btn.scroll_into_view_if_needed()
+                    try:
+                        page.wait_for_selector('//button[contains(., "Υποβολή") and not(@disabled)]', timeout=nav_timeout)
+                    except:
+                        pass
+
+                    if not submit_btn.is_enabled():
+                        raise FatalRowError("Αποθηκεύτηκε, αλλά το κουμπί Υποβολή δεν ενεργοποιήθηκε", saved)
+                    # Η υποβολή ολοκληρώνεται με την απάντηση του αιτήματος που στέλνει το κλικ
+                    with page.expect_response(is_mutation_response, timeout=nav_timeout) as response:
+                        submit_btn.click()
+                        print("③ Κλικ Υποβολής")
+                    if not response.value.ok:
+                        raise FatalRowError(f"Η υποβολή απέτυχε (HTTP {response.value.status})", saved)
+                    print("④ Η Υποβολή καταχωρήθηκε")
+                self.capture_evidence(page, row, key)
+        except FatalRowError:
+            raise
+        except Exception as e:
+            raise FatalRowError(f"Σφάλμα μετά την αποθήκευση: {e}", saved) from e
+
+        # 10. Επιστροφή (η γραμμή έχει ολοκληρωθεί· αν η πλοήγηση αποτύχει, επαναφορά πριν την επόμενη).
+        # Σε pipeline η καρτέλα μένει στη φόρμα και ξαναφορτώνεται όταν έρθει η σειρά της.
+        if spare is not None:
+            return
+        with span(key, "return"):
+            try:
+                try:
+                    page.click(f'a[href="{LIST_PATH}"]', timeout=3_000)
+                except:
+                    page.click('button:has-text("Επιστροφή")')
+                    try:
+                        page.wait_for_url(f"**{LIST_PATH}", wait_until="commit", timeout=nav_timeout)
+                    except:
+                        if page.locator('button:has-text("Επιστροφή")').is_visible():
+                            page.click('button:has-text("Επιστροφή")')
+                # Η λίστα είναι έτοιμη για την επόμενη γραμμή
+                page.wait_for_url(f"**{LIST_PATH}", wait_until="commit", timeout=nav_timeout)
+                page.wait_for_selector("text=Προσθήκη", state="visible", timeout=nav_timeout)
+            except Exception as e:
+                print(f"Η επιστροφή στη λίστα απέτυχε ({e}) - επαναφορά")
+                try:
+                    recover_list_view(page, nav_timeout, self.account)
+                except Exception as re_err:
+                    print(f"Η επαναφορά στη λίστα απέτυχε: {re_err}")
+
+def load_excel(path):
+    # Διαβάζει μόνο τις στήλες που χρειάζεται ο agent (openpyxl σε read-only λειτουργία)
+    # και κρατά το αποτέλεσμα ώστε "Έλεγχος" και "Έναρξη" να μη διαβάζουν το αρχείο δύο φορές
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    with _excel_cache_lock:
+        cached = _excel_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1].copy(), {"seconds": 0.0, "peak_mb": 0.0, "rows": len(cached[1]), "cached": True}
+
+    wanted = set(REQUIRED_COLS + STATUS_COLS)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    df = pd.read_excel(path, dtype=str, usecols=lambda c: c in wanted)
+    seconds = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+
+    with _excel_cache_lock:
+        _excel_cache[path] = (key, df)
+    stats = {"seconds": seconds, "rows": len(df), "cached": False, "peak_mb": rss_after,
+             "growth_mb": None if rss_after is None else rss_after - rss_before}
+    return df.copy(), stats
+
+def peak_rss_mb():
+    # Μέγιστο RSS της διεργασίας (χωρίς κόστος, σε αντίθεση με το tracemalloc)· KB στο Linux, bytes στο macOS
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1048576
+
+def load_stats_text(stats):
+    if stats["cached"]:
+        return f"Excel: {stats['rows']} γραμμές (χωρίς νέα ανάγνωση)"
+    text = f"Excel: {stats['rows']} γραμμές σε {stats['seconds']:.2f} s"
+    if stats["peak_mb"] is not None:
+        text += f", μέγιστη μνήμη διεργασίας {stats['peak_mb']:.0f} MB (+{stats['growth_mb']:.0f} MB)"
+    return text
+
+def write_status_columns(path, df):
+    # Γράφει μόνο τις στήλες κατάστασης στο πρώτο φύλλο, κρατώντας τις υπόλοιπες στήλες και τη μορφοποίηση
+    wb = openpyxl.load_workbook(path)
+    ws = wb.worksheets[0]
+    header = {cell.value: cell.column for cell in ws[1] if cell.value is not None}
+    for col in STATUS_COLS:
+        if col not in header:
+            header[col] = max(header.values(), default=0) + 1
+            ws.cell(row=1, column=header[col], value=col)
+        for index, value in df[col].items():
+            if pd.isna(value) or value == "":
+                continue
+            cell = ws.cell(row=index + 2, column=header[col])
+            if str(cell.value) != value:
+                cell.value = value
+    wb.save(path)
+
+class RunProfiler:
+    # Χρονομέτρηση φάσεων ανά γραμμή σε JSONL (logs/run_<χρόνος>_<pid>_<αύξων>.jsonl) και σύνοψη στο τέλος
+    def __init__(self, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.run_id = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}_{next(_run_counter)}"
+        self.path = os.path.join(directory, f"run_{self.run_id}.jsonl")
+        self.lock = threading.Lock()
+        self.fh = open(self.path, "a", encoding="utf-8")
+        self.phases = {}
+        self.rows = {}
+        self.listener = None  # π.χ. PortalHealth.observe(phase, ms, ok)
+
+    @contextmanager
+    def span(self, row, phase):
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(row, phase, (time.perf_counter() - start) * 1000, ok)
+
+    def record(self, row, phase, ms, ok=True):
+        entry = {"run": self.run_id, "ts": datetime.now().isoformat(timespec="milliseconds"),
+                 "worker": threading.current_thread().name, "row": row, "phase": phase,
+                 "ms": round(ms, 1), "ok": ok}
+        with self.lock:
+            self.fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.fh.flush()
+            self.phases.setdefault(phase, []).append(ms)
+            if phase == "row":
+                self.rows[row] = ms
+        if self.listener is not None:
+            self.listener(phase, ms, ok)
+
+    def close(self):
+        with self.lock:
+            self.fh.close()
+
+    def summary(self, slowest=5):
+        with self.lock:
+            phases = {k: list(v) for k, v in self.phases.items()}
+            rows = dict(self.rows)
+        lines = [f"Χρονομέτρηση ({os.path.basename(self.path)}):"]
+        for phase, values in phases.items():
+            p50, p95 = np.percentile(values, [50, 95])
+            lines.append(f"  {phase}: n={len(values)}  p50={p50:.0f} ms  p95={p95:.0f} ms  max={max(values):.0f} ms")
+        for name, ms in sorted(rows.items(), key=lambda kv: kv[1], reverse=True)[:slowest]:
+            lines.append(f"  Αργή γραμμή: {name} ({ms / 1000:.1f} s)")
+        return lines
+
+class PortalHealth:
+    # Κυλιόμενο παράθυρο καθυστέρησης/σφαλμάτων της πύλης με ρύθμιση AIMD: όταν αργεί ή αποτυγχάνει,
+    # οι ταυτόχρονοι workers υποδιπλασιάζονται και η παύση μεταξύ γραμμών διπλασιάζεται·
+    # όσο είναι υγιής, ένας worker παραπάνω και ένα βήμα λιγότερη παύση ανά HEALTH_INCREASE_EVERY δείγματα
+    def __init__(self, workers, pacing, emit):
+        self.workers = workers
+        self.limits = {phase: pacing[key] for phase, key in HEALTH_PHASES.items()}
+        self.emit = emit
+        self.samples = deque(maxlen=HEALTH_WINDOW)  # (ms, ms / timeout, ok)
+        self.allowed = workers  # ξεκινά με όλους τους workers· η μείωση έρχεται μόνο αν η πύλη αργεί ή αποτυγχάνει
+        self.delay = 0.0
+        self.active = 0
+        self.state = "ok"
+        self.since_change = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.active >= self.allowed:
+                self.cond.wait()
+            self.active += 1
+
+    def release(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify_all()
+
+    def pause(self):
+        if self.delay:
+            time.sleep(self.delay)
+
+    def observe(self, phase, ms, ok):
+        limit = self.limits.get(phase)
+        if limit is None:
+            return
+        with self.cond:
+            self.samples.append((ms, ms / limit, ok))
+            self.since_change += 1
+            if len(self.samples) < HEALTH_MIN_SAMPLES:
+                return
+            error_rate = sum(not s[2] for s in self.samples) / len(self.samples)
+            slow = np.percentile([s[1] for s in self.samples], 90) > HEALTH_SLOW_RATIO
+            state = "σφάλματα" if error_rate > HEALTH_MAX_ERROR_RATE else "αργή" if slow else "ok"
+            changed = state != self.state
+            if state != "ok" and self.since_change >= HEALTH_COOLDOWN:
+                self.allowed = max(1, self.allowed // 2)
+                self.delay = min(HEALTH_MAX_DELAY, max(HEALTH_DELAY_STEP, self.delay * 2))
+                self.since_change = 0
+                changed = True
+            elif state == "ok" and self.since_change >= HEALTH_INCREASE_EVERY and (self.allowed < self.workers or self.delay):
+                self.allowed = min(self.workers, self.allowed + 1)
+                self.delay = max(0.0, self.delay - HEALTH_DELAY_STEP)
+                self.since_change = 0
+                changed = True
+                self.cond.notify_all()
+            self.state = state
+            snapshot = {"state": state, "p50_ms": round(float(np.median([s[0] for s in self.samples]))),
+                        "error_rate": round(error_rate, 2), "allowed": self.allowed,
+                        "workers": self.workers, "delay": self.delay}
+        if changed:
+            self.emit("health", **snapshot)
+
+def health_text(data):
+    return (f"Πύλη: {data['state']} · p50 {data['p50_ms'] / 1000:.1f} s · σφάλματα {data['error_rate']:.0%}"
+            f" · workers {data['allowed']}/{data['workers']} · παύση {data['delay']:.0f} s")
+
+def evidence_key(row):
+    # Μοναδικό ανά γραμμή: ΑΦΜ, έργο, δικαιολογητικό και όνομα αρχείου
+    afm = re.search(r'\d{9}', str(row["ben"]))
+    parts = [afm.group(0) if afm else str(row["ben"]), row["app"], row["doc"], row["fname"]]
+    return re.sub(r'[^\w.-]+', '_', "_".join(str(p).strip() for p in parts))
+
+def evidence_screenshot(page):
+    # Μόνο το στοιχείο της φόρμας (όχι full page) και JPEG: λίγα KB και λιγότερος χρόνος στο thread της σελίδας
+    options = {"type": "jpeg", "quality": EVIDENCE_JPEG_QUALITY, "animations": "disabled", "timeout": EVIDENCE_TIMEOUT}
+    target = page.locator(EVIDENCE_SELECTOR).first
+    try:
+        if target.count():
+            return target.screenshot(**options)
+    except Exception as e:
+        print(f"Στιγμιότυπο φόρμας απέτυχε ({e}) - στιγμιότυπο οθόνης")
+    return page.screenshot(**options)
+
+class EvidenceWriter:
+    # Ένα thread για όλους τους workers: οι γραμμές συνεχίζουν όσο γράφεται το αποδεικτικό.
+    # Το index και το όριο μεγέθους αφορούν έναν φάκελο, άρα ένας writer ανά φάκελο τη φορά
+    # (οι εργασίες της ουράς γράφουν στο δικό τους SCREEN_DIR/job_<id>, βλ. opske_jobs.prune_job_evidence).
+    def __init__(self, directory=SCREEN_DIR, max_mb=EVIDENCE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = max_mb * 1048576
+        self.index_path = os.path.join(directory, EVIDENCE_INDEX)
+        self.queue = queue.Queue(maxsize=EVIDENCE_QUEUE_SIZE)
+        self.files = {}    # όνομα -> (mtime, bytes)
+        self.by_hash = {}  # sha256 -> όνομα
+        self.names = {}    # όνομα -> sha256
+        self.total = 0
+        self.stats = {"captures": 0, "written": 0, "bytes": 0, "duplicates": 0, "pruned": 0}
+        self.load()
+        self.thread = threading.Thread(target=self.loop, name="evidence", daemon=True)
+        self.thread.start()
+
+    def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name != EVIDENCE_INDEX:
+                st = entry.stat()
+                self.files[entry.name] = (st.st_mtime, st.st_size)
+                self.total += st.st_size
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("file") in self.files and not rec.get("duplicate"):
+                        self.remember(rec["sha256"], rec["file"])
+
+    def remember(self, sha, name):
+        old = self.names.pop(name, None)
+        if old is not None and self.by_hash.get(old) == name:
+            del self.by_hash[old]
+        self.by_hash[sha] = name
+        self.names[name] = sha
+
+    def put(self, key, kind, data):
+        self.queue.put((key, kind, data))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def loop(self):
+        self.index = open(self.index_path, "a", encoding="utf-8")
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                try:
+                    rec = self.write(*item)
+                    self.index.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    self.index.flush()
+                except Exception as e:
+                    print(f"Αποτυχία εγγραφής αποδεικτικού {item[0]}: {e}")
+        finally:
+            self.index.close()
+
+    def write(self, key, kind, data):
+        self.stats["captures"] += 1
+        sha = hashlib.sha256(data).hexdigest()
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "key": key, "sha256": sha}
+        name = self.by_hash.get(sha)
+        if name is not None:
+            # Ίδιο περιεχόμενο με προηγούμενο αποδεικτικό: μόνο αναφορά στο index.
+            # Το αρχείο "ανανεώνεται" ώστε να μη διαγραφεί πριν από όσα δεν τα δείχνει κανείς (LRU).
+            self.stats["duplicates"] += 1
+            now = time.time()
+            try:
+                os.utime(os.path.join(self.directory, name), (now, now))
+            except OSError:
+                pass
+            self.files[name] = (now, self.files[name][1])
+            return dict(rec, file=name, duplicate=True)
+
+        if kind == "html":
+            data, name = gzip.compress(data, 6), key + ".html.gz"
+        else:
+            name = key + ".jpg"
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        self.total -= self.files.get(name, (0, 0))[1]
+        self.files[name] = (time.time(), len(data))
+        self.total += len(data)
+        self.remember(sha, name)
+        self.stats["written"] += 1
+        self.stats["bytes"] += len(data)
+        self.prune()
+        return dict(rec, file=name, bytes=len(data))
+
+    def prune(self):
+        # Πάνω από το όριο: διαγραφή των λιγότερο πρόσφατα χρησιμοποιημένων μέχρι το 90% του ορίου
+        if self.total <= self.max_bytes:
+            return
+        removed = set()
+        for name, (_, size) in sorted(self.files.items(), key=lambda kv: kv[1][0]):
+            if self.total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            del self.files[name]
+            self.total -= size
+            sha = self.names.pop(name, None)
+            if sha is not None and self.by_hash.get(sha) == name:
+                del self.by_hash[sha]
+            removed.add(name)
+            self.stats["pruned"] += 1
+        if removed:
+            self.compact(removed)
+
+    def compact(self, removed):
+        # Το index δεν κρατά εγγραφές για διαγραμμένα αρχεία: ξαναγράφεται χωρίς αυτές
+        self.index.close()
+        tmp = self.index_path + ".tmp"
+        with open(self.index_path, encoding="utf-8") as src, open(tmp, "w", encoding="utf-8") as dst:
+            for line in src:
+                try:
+                    if json.loads(line).get("file") in removed:
+                        continue
+                except ValueError:
+                    continue
+                dst.write(line)
+        os.replace(tmp, self.index_path)
+        self.index = open(self.index_path, "a", encoding="utf-8")
+
+    def report(self):
+        st = self.stats
+        text = (f"Αποδεικτικά: {st['written']} αρχεία ({st['bytes'] / 1048576:.1f} MB), "
+                f"{st['duplicates']} ίδια με προηγούμενα")
+        if st["pruned"]:
+            text += f", {st['pruned']} παλαιότερα διαγράφηκαν (όριο {self.max_bytes / 1048576:.0f} MB)"
+        return text
+
+class AssetRouter:
+    # Ένας router για όλους τους workers (κάθε context καλεί handle από το δικό του thread)
+    def __init__(self, mode=DEFAULT_ASSET_MODE, cache_dir=ASSET_CACHE_DIR):
+        self.mode = mode
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.stats = {"blocked": 0, "blocked_bytes": 0, "cached": 0, "cached_bytes": 0, "fetched": 0}
+
+    def attach(self, context):
+        if self.mode != "off":
+            context.route("**/*", self.handle)
+
+    def add(self, key, size=0):
+        with self.lock:
+            self.stats[key] += 1
+            if size:
+                self.stats[key + "_bytes"] += size
+
+    def cache_file(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def handle(self, route):
+        request = route.request
+        host = urlsplit(request.url).hostname or ""
+        if host.endswith(BLOCK_HOSTS) or (self.mode == "block" and request.resource_type in BLOCK_RESOURCE_TYPES):
+            # Το μέγεθος είναι γνωστό μόνο αν το αρχείο έχει κατέβει κάποτε στην cache
+            path = self.cache_file(request.url)
+            self.add("blocked", os.path.getsize(path) if os.path.exists(path) else 0)
+            route.abort()
+            return
+        if self.mode == "cache" and request.method == "GET" and request.resource_type in CACHE_RESOURCE_TYPES:
+            try:
+                self.serve_cached(route)
+                return
+            except Exception as e:
+                print(f"⚠️ Cache στατικών αρχείων: {request.url}: {e}")
+                try:
+                    route.fallback()
+                except Exception:
+                    pass  # το αίτημα είχε ήδη απαντηθεί
+                return
+        route.fallback()
+
+    def serve_cached(self, route):
+        path = self.cache_file(route.request.url)
+        try:
+            fresh = time.time() - os.path.getmtime(path) < ASSET_CACHE_MAX_AGE
+        except OSError:
+            fresh = False
+        if fresh:
+            with open(path + ".json", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(path, "rb") as fh:
+                body = fh.read()
+            route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            self.add("cached", len(body))
+            return
+        response = route.fetch()
+        body = response.body()
+        if response.ok:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in ASSET_DROP_HEADERS}
+            with open(path + ".json.tmp", "w", encoding="utf-8") as fh:
+                json.dump({"url": route.request.url, "status": response.status, "headers": headers}, fh)
+            with open(path + ".tmp", "wb") as fh:
+                fh.write(body)
+            os.replace(path + ".json.tmp", path + ".json")
+            os.replace(path + ".tmp", path)
+        route.fulfill(response=response, body=body)
+        self.add("fetched")
+
+    def report(self):
+        with self.lock:
+            st = dict(self.stats)
+        return (f"Στατικά αρχεία ({self.mode}): {st['blocked']} αιτήματα αποκλείστηκαν"
+                f" (≥{st['blocked_bytes'] / 1048576:.1f} MB), {st['cached']} από τοπική cache"
+                f" ({st['cached_bytes'] / 1048576:.1f} MB), {st['fetched']} κατέβηκαν")
+
+class RowScheduler:
+    # Μία λωρίδα γραμμών ανά worker· όποιος αδειάσει τη δική του παίρνει από το τέλος της πιο γεμάτης
+    def __init__(self, lanes):
+        self.lanes = [deque(lane) for lane in lanes] or [deque()]
+        self.lock = threading.Lock()
+
+    def get(self, lane=0):
+        with self.lock:
+            own = self.lanes[lane % len(self.lanes)]
+            if own:
+                return own.popleft()
+            busiest = max(self.lanes, key=len)
+            if busiest:
+                return busiest.pop()
+        raise queue.Empty
+
+    def qsize(self):
+        with self.lock:
+            return sum(len(lane) for lane in self.lanes)
+
+    def empty(self):
+        return self.qsize() == 0
+
+def row_groups(df):
+    # (ΑΦΜ, κωδικός έργου) ανά γραμμή· χωρίς ΑΦΜ η ομάδα είναι η επωνυμία όπως γράφτηκε
+    ben = df["Επωνυμία – ΑΦΜ"].astype(object).map(str).str.strip()
+    afm = ben.str.extract(r"(\d{9})", expand=False).fillna(ben.str.upper())
+    project = df["Κωδικός έργου"].astype(object).map(str).str.strip().str.upper()
+    return pd.Series(list(zip(afm, project)), index=df.index)
+
+def schedule_rows(df, lanes):
+    # Σειρά: δικαιούχος, έργο, αρχική σειρά (όλα με σειρά πρώτης εμφάνισης). Οι δικαιούχοι μοιράζονται
+    # στις λωρίδες από τον μεγαλύτερο προς τον μικρότερο, κάθε φορά στη λιγότερο φορτωμένη
+    groups = row_groups(df)
+    afm_rank = pd.factorize(groups.map(lambda g: g[0]))[0]
+    group_rank = pd.factorize(groups)[0]
+    order = df.index[np.lexsort((np.arange(len(df)), group_rank, afm_rank))]
+    by_afm = {}
+    for index, rank in zip(order, afm_rank[df.index.get_indexer(order)]):
+        by_afm.setdefault(rank, []).append(index)
+    result = [[] for _ in range(max(1, lanes))]
+    for rank in sorted(by_afm, key=lambda r: (-len(by_afm[r]), r)):
+        min(result, key=len).extend(by_afm[rank])
+    return result
+
+def interleave(lanes):
+    # Η σειρά με την οποία θα ξεκινήσουν οι γραμμές όταν όλοι οι workers τρέχουν παράλληλα
+    order = []
+    for i in range(max((len(lane) for lane in lanes), default=0)):
+        order.extend(lane[i] for lane in lanes if i < len(lane))
+    return order
+
+def estimate_duration(lane_sizes, directory=PROFILE_DIR):
+    # Διάμεσος χρόνος γραμμής και login από τις τελευταίες εκτελέσεις· η πιο φορτωμένη λωρίδα καθορίζει τη διάρκεια
+    paths = sorted(p for p in os.listdir(directory) if p.startswith("run_") and p.endswith(".jsonl")) \
+        if os.path.isdir(directory) else []
+    paths = paths[-ESTIMATE_HISTORY_RUNS:]
+    rows, logins = [], []
+    for name in paths:
+        with open(os.path.join(directory, name), encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("phase") == "row" and entry.get("ok"):
+                    rows.append(entry["ms"])
+                elif entry.get("phase") == "login" and entry.get("ok"):
+                    logins.append(entry["ms"])
+    if not rows:
+        return None
+    login = np.median(logins) if logins else 0.0
+    return float(login + np.median(rows) * max(lane_sizes, default=0)) / 1000, len(paths)
+
+def journal_path(excel_path):
+    return os.path.abspath(excel_path) + JOURNAL_SUFFIX
+
+class StatusJournal:
+    # Append-only JSONL: μία εγγραφή (με fsync) μετά από κάθε επιτυχημένη γραμμή
+    def __init__(self, excel_path, pending=0):
+        # pending: εγγραφές που υπάρχουν ήδη στο αρχείο και δεν έχουν περάσει στο Excel
+        self.path = journal_path(excel_path)
+        self.lock = threading.Lock()
+        self.pending = pending
+        self.fh = open(self.path, "a", encoding="utf-8")
+
+    def append(self, index, fname, values):
+        record = {"row": int(index), "fname": fname, **values}
+        with self.lock:
+            self.fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+            self.pending += 1
+            return self.pending
+
+    def truncate(self):
+        with self.lock:
+            self.fh.truncate(0)
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            self.fh.close()
+            empty = self.pending == 0
+        if empty:
+            os.remove(self.path)
+
+def replay_journal(excel_path, df):
+    # Εφαρμόζει τις εγγραφές στο df, μόνο όπου η γραμμή έχει ακόμα το ίδιο όνομα αρχείου
+    path = journal_path(excel_path)
+    if not os.path.exists(path):
+        return 0
+    applied = 0
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # μισογραμμένη τελευταία γραμμή μετά από crash
+            index = record.pop("row")
+            fname = record.pop("fname")
+            if index not in df.index or str(df.at[index, "Όνομα αρχείου"]).strip() != fname:
+                print(f"Παράλειψη εγγραφής ημερολογίου για {fname}: η γραμμή {index + 2} άλλαξε")
+                continue
+            for col, value in record.items():
+                df.loc[index, col] = value
+            applied += 1
+    return applied
+
+def replay_into_workbook(excel_path, df):
+    # Ενημερώσεις από προηγούμενη εκτέλεση που δεν πρόλαβαν να γραφτούν στο Excel· επιστρέφει
+    # πόσες εγγραφές μένουν στο ημερολόγιο
+    replayed = replay_journal(excel_path, df)
+    if not replayed:
+        return 0
+    print(f"Επαναφορά {replayed} ενημερώσεων από το ημερολόγιο")
+    try:
+        write_status_columns(excel_path, df)
+    except Exception as e:
+        # π.χ. το Excel είναι ανοιχτό: οι τιμές είναι ήδη στο df, το ημερολόγιο μένει για το επόμενο flush
+        print(f"Η εγγραφή στο Excel απέτυχε ({e}) - οι ενημερώσεις παραμένουν στο ημερολόγιο")
+        return replayed
+    os.remove(journal_path(excel_path))
+    return 0
+
+def afm_checksum_mask(afms, validate_afm):
+    # Έλεγχος ψηφίου ΑΦΜ για όλη τη στήλη με NumPy (ASCII ψηφία), αλλιώς ένα-ένα
+    result = np.zeros(len(afms), dtype=bool)
+    ascii_mask = afms.str.fullmatch(r"[0-9]{9}").to_numpy(dtype=bool)
+    if ascii_mask.any():
+        digits = np.frombuffer("".join(afms[ascii_mask]).encode("ascii"), dtype=np.uint8)
+        digits = digits.reshape(-1, 9).astype(np.int64) - ord("0")
+        remainder = (digits[:, :8] @ np.array(AFM_WEIGHTS)) % 11
+        result[ascii_mask] = digits[:, 8] == np.where(remainder == 10, 0, remainder)
+    for i in np.flatnonzero(~ascii_mask):
+        result[i] = validate_afm(afms.iloc[i])
+    return result
+
+def date_check_codes(values, now, later_is_bad):
+    # 0: εντάξει, 1: μη έγκυρη ημερομηνία, 2: μετά (ή πριν) από σήμερα
+    try:
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+        if not pd.api.types.is_datetime64_dtype(parsed):
+            raise TypeError("μη ενιαία ζώνη ώρας")
+        out_of_range = parsed > now if later_is_bad else parsed < now
+        codes = np.select([parsed.isna().to_numpy(), out_of_range.to_numpy()], [1, 2], 0)
+        return pd.Series(codes, index=values.index)
+    except (TypeError, ValueError, OverflowError):
+        return pd.Series([date_check_code(v, now, later_is_bad) for v in values], index=values.index)
+
+def date_check_code(value, now, later_is_bad):
+    try:
+        d = pd.to_datetime(value, errors='coerce')
+        if pd.isna(d):
+            return 1
+        return 2 if (d > now if later_is_bad else d < now) else 0
+    except:
+        return 1
+
+def build_folder_index(folder):
+    # Ένα πέρασμα os.scandir: basename -> FileEntry και basename -> [ονόματα] για τα διπλότυπα
+    index = {}
+    duplicates = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            base = os.path.splitext(entry.name)[0]
+            st = entry.stat()
+            if base in index:
+                duplicates.setdefault(base, [os.path.basename(index[base].path)]).append(entry.name)
+                continue
+            index[base] = FileEntry(entry.path, st.st_size, st.st_mtime)
+    return index, duplicates
+
+def duplicate_reason(base_name, names):
+    return f"Βρέθηκαν πολλά αρχεία με το όνομα {base_name}: {', '.join(sorted(names))}"
+
+def fingerprint_file(path):
+    # Ένα σειριακό διάβασμα: τύπος από το πρώτο κομμάτι και sha256 όλου του αρχείου
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            head = f.read(HASH_CHUNK)
+            digest.update(head)
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+    except OSError as e:
+        return Fingerprint(None, None, str(e))
+    kind = next((k for k, magic in MAGIC_BYTES.items() if head.startswith(magic)), None)
+    return Fingerprint(kind, digest.hexdigest(), None)
+
+def load_file_cache(folder):
+    try:
+        with open(os.path.join(folder, FILE_CACHE_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_file_cache(folder, cache):
+    # Σε φάκελο μόνο-ανάγνωσης (π.χ. κοινόχρηστο δικτύου) απλώς δεν αποθηκεύεται
+    path = os.path.join(folder, FILE_CACHE_NAME)
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️ Δεν αποθηκεύτηκε το ευρετήριο ελέγχου αρχείων: {e}")
+
+def fingerprint_files(folder, entries, workers=FILE_CHECK_WORKERS):
+    # entries: όνομα -> FileEntry. Αμετάβλητα αρχεία (ίδιο size/mtime) έρχονται από το sidecar,
+    # τα υπόλοιπα διαβάζονται παράλληλα (I/O: τα threads αρκούν και σε δίσκους δικτύου)
+    cache = load_file_cache(folder)
+    result = {}
+    todo = []
+    for base, entry in entries.items():
+        hit = cache.get(os.path.basename(entry.path))
+        if hit and hit[0] == entry.size and hit[1] == entry.mtime:
+            result[base] = Fingerprint(hit[2], hit[3], None)
+        else:
+            todo.append(base)
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for base, fp in zip(todo, pool.map(fingerprint_file, [entries[b].path for b in todo])):
+                result[base] = fp
+                if not fp.error:
+                    entry = entries[base]
+                    cache[os.path.basename(entry.path)] = [entry.size, entry.mtime, fp.kind, fp.sha256]
+        save_file_cache(folder, cache)
+    return result
+
+def can_compress(kind):
+    return Image is not None and (kind != "pdf" or pikepdf is not None)
+
+def flatten_image(img):
+    # Σε RGB/L χωρίς διαφάνεια (λευκό φόντο) και μέγιστη πλευρά COMPRESS_MAX_SIDE
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.split()[-1])
+        img = background
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.thumbnail((COMPRESS_MAX_SIDE, COMPRESS_MAX_SIDE))
+    return img
+
+def compress_image(src, dst):
+    # Και τα PNG γίνονται JPEG: οι σαρώσεις δεν χρειάζονται lossless
+    with Image.open(src) as img:
+        flatten_image(img).save(dst, "JPEG", quality=COMPRESS_JPEG_QUALITY, optimize=True)
+
+def compress_pdf(src, dst):
+    # Επανασυμπίεση των εικόνων κάθε σελίδας σε JPEG· μάσκες και 1-bit σαρώσεις μένουν ως έχουν
+    with pikepdf.open(src) as pdf:
+        for page in pdf.pages:
+            for raw in page.images.values():
+                if raw.get("/ImageMask") or raw.get("/SMask") is not None or int(raw.get("/BitsPerComponent", 8)) < 8:
+                    continue
+                try:
+                    img = flatten_image(pikepdf.PdfImage(raw).as_pil_image())
+                except Exception:
+                    continue
+                buf = io.BytesIO()
+                img.save(buf, "JPEG", quality=COMPRESS_JPEG_QUALITY, optimize=True)
+                if buf.tell() >= len(raw.read_raw_bytes()):
+                    continue
+                raw.write(buf.getvalue(), filter=pikepdf.Name.DCTDecode)
+                raw.Width, raw.Height = img.size
+                raw.ColorSpace = pikepdf.Name.DeviceGray if img.mode == "L" else pikepdf.Name.DeviceRGB
+                raw.BitsPerComponent = 8
+                for key in ("/DecodeParms", "/Decode"):
+                    if key in raw:
+                        del raw[key]
+        pdf.save(dst, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+
+def compress_file(src, out_dir):
+    # Τρέχει σε process pool. Επιστρέφει (διαδρομή, μέγεθος) ή None αν δεν κέρδισε χώρο.
+    # Το όνομα (χωρίς επέκταση) μένει ίδιο, ώστε η πύλη να δείχνει το αρχικό αρχείο.
+    base, ext = os.path.splitext(os.path.basename(src))
+    ext = ext.lower()
+    dst = os.path.join(out_dir, base + (".pdf" if ext == ".pdf" else ".jpg"))
+    if not os.path.exists(dst):
+        os.makedirs(out_dir, exist_ok=True)
+        tmp = dst + ".tmp"
+        if ext == ".pdf":
+            compress_pdf(src, tmp)
+        else:
+            compress_image(src, tmp)
+        os.replace(tmp, dst)
+    size = os.path.getsize(dst)
+    if size >= os.path.getsize(src):
+        return None
+    return dst, size
+
+def content_duplicates(fingerprints):
+    # Ομάδες ονομάτων με ίδιο sha256 (το ίδιο έγγραφο σε δύο γραμμές)
+    groups = {}
+    for base, fp in fingerprints.items():
+        if fp.sha256:
+            groups.setdefault(fp.sha256, []).append(base)
+    return [sorted(names) for names in groups.values() if len(names) > 1]
+
+def account_key(account):
+    return re.sub(r'\W', '_', account).upper()
+
+def account_credentials(account=DEFAULT_ACCOUNT):
+    if not account:
+        return USERNAME, PASSWORD
+    key = account_key(account)
+    username = os.environ.get(f"OPSKE_USER_{key}")
+    password = os.environ.get(f"OPSKE_PASS_{key}")
+    if not username or not password:
+        raise RuntimeError(f"Λείπουν τα στοιχεία του λογαριασμού '{account}' (OPSKE_USER_{key} / OPSKE_PASS_{key})")
+    return username, password
+
+def state_path(account=DEFAULT_ACCOUNT):
+    if not account:
+        return STATE_PATH
+    root, ext = os.path.splitext(STATE_PATH)
+    return f"{root}_{account_key(account).lower()}{ext}"
+
+def session_lock(account=DEFAULT_ACCOUNT):
+    # Ένα login τη φορά ανά λογαριασμό, κοινό για όλα τα engines της διεργασίας (π.χ. ουρά εργασιών)
+    with _session_lock:
+        return _session_locks.setdefault(account, threading.Lock())
+
+def login(page, account=DEFAULT_ACCOUNT):
+    username, password = account_credentials(account)
+    page.goto(BASE_URL + "/")
+    page.click("text=Σύνδεση ΑΑΔΕ")
+    page.fill("#j_username", username)
+    page.fill("#j_password", password)
+    page.click("button:has-text('Σύνδεση')")
+    page.wait_for_selector("#btn-submit")
+    page.click("#btn-submit")
+    page.click("text=Τα Δικαιολογητικά Δικαιούχου μου")
+
+def session_is_valid(page):
+    # Γρήγορος έλεγχος: η λίστα δικαιολογητικών ανοίγει χωρίς ανακατεύθυνση στο login
+    try:
+        page.goto(LIST_URL, timeout=SESSION_PROBE_TIMEOUT)
+        if LIST_PATH not in page.url:
+            return False
+        page.wait_for_selector("text=Προσθήκη", state="visible", timeout=SESSION_PROBE_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+def open_session(browser, router=None, account=DEFAULT_ACCOUNT):
+    # Ένα login τη φορά: οι υπόλοιποι workers βρίσκουν έτοιμη τη νέα συνεδρία
+    path = state_path(account)
+    with session_lock(account):
+        if os.path.exists(path):
+            try:
+                context = browser.new_context(storage_state=path)
+            except Exception as e:
+                print(f"Μη αναγνώσιμη αποθηκευμένη συνεδρία: {e}")
+            else:
+                if router is not None:
+                    router.attach(context)
+                page = context.new_page()
+                if session_is_valid(page):
+                    print("Επαναχρησιμοποίηση αποθηκευμένης συνεδρίας")
+                    return context, page
+                print("Η αποθηκευμένη συνεδρία έληξε - νέα σύνδεση...")
+                context.close()
+
+        context = browser.new_context()
+        if router is not None:
+            router.attach(context)
+        page = context.new_page()
+        login(page, account)
+        save_storage_state(context, account)
+        return context, page
+
+def save_storage_state(context, account=DEFAULT_ACCOUNT):
+    # Ατομική εγγραφή: άλλες διεργασίες (π.χ. παράλληλα workbooks) δεν βλέπουν μισό αρχείο
+    path = state_path(account)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(context.storage_state(), fh)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, path)
+
+def preload_list(page, timeout):
+    # Ξεκινά τη φόρτωση της λίστας χωρίς να περιμένει το render (μόνο μέχρι το commit της πλοήγησης)
+    try:
+        page.goto(LIST_URL, wait_until="commit", timeout=timeout)
+    except Exception as e:
+        print(f"Η προφόρτωση της λίστας απέτυχε: {e}")
+
+def open_form_ahead(page, timeout, account=DEFAULT_ACCOUNT):
+    # Κλικ στο Προσθήκη χωρίς αναμονή για τη φόρμα· την περιμένει η επόμενη γραμμή
+    try:
+        page.wait_for_selector("text=Προσθήκη", state="visible", timeout=timeout)
+        page.click("text=Προσθήκη", no_wait_after=True)
+        return True
+    except Exception as e:
+        print(f"Η φόρμα της επόμενης γραμμής δεν άνοιξε από πριν: {e}")
+        try:
+            recover_list_view(page, timeout, account)
+        except Exception:
+            pass
+        return False
+
+def recover_list_view(page, timeout, account=DEFAULT_ACCOUNT):
+    # Φρέσκια φόρτωση της λίστας δικαιολογητικών· αν η συνεδρία έληξε, νέο login
+    page.goto(LIST_URL, timeout=timeout)
+    if LIST_PATH not in page.url:
+        print("Η συνεδρία έληξε - νέο login")
+        with session_lock(account):
+            login(page, account)
+            save_storage_state(page.context, account)
+        page.goto(LIST_URL, timeout=timeout)
+    page.wait_for_selector("text=Προσθήκη", state="visible", timeout=timeout)
+
+def is_retryable(exc):
+    # Παροδικά: timeouts/σφάλματα της πύλης ή του browser. Μόνιμα: δεδομένα γραμμής, αρχείο, ή πιθανή ήδη αποθήκευση
+    return not isinstance(exc, (FatalRowError, ValueError, FileNotFoundError, PermissionError))
+
+def backoff_delay(attempt):
+    # Εκθετική αναμονή με jitter, ώστε παράλληλοι workers να μην ξαναχτυπούν την πύλη ταυτόχρονα
+    cap = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return random.uniform(cap / 2, cap)
+
+def option_texts(page):
+    # Τα κείμενα όλων των επιλογών του ανοιχτού dropdown με ένα round-trip
+    return page.locator(OPTION_XPATH).evaluate_all("els => els.map(e => (e.textContent || '').trim())")
+
+def wait_network_idle(page, timeout):
+    # Αναμονή για ηρεμία δικτύου, χωρίς αποτυχία αν η πύλη κρατά ανοιχτές συνδέσεις
+    try:
+        page.wait_for_load_state("networkidle", timeout=timeout)
+    except Exception:
+        pass
+
+def is_mutation_response(response):
+    # Απάντηση σε αίτημα XHR/fetch που αλλάζει δεδομένα (POST/PUT/PATCH/DELETE)
+    request = response.request
+    return request.method != "GET" and request.resource_type in ("xhr", "fetch")
+
+def wait_for_text_change(page, locator, old_text):
+    # Αναμονή μέχρι να αλλάξει (ή να ξαναγίνει render) το στοιχείο
+    handle = locator.element_handle()
+    page.wait_for_function(
+        "([el, old]) => !el.isConnected || el.textContent.trim() !== old",
+        arg=[handle, old_text],
+    )
+
+def check_date_bounds(day, month, year):
+    today = datetime.today()
+    max_p = today.replace(year=today.year-100)
+    max_f = today.replace(year=today.year+10)
+    tgt = datetime(year=year, month=month, day=1)
+    
+    if tgt < max_p or tgt > max_f:
+        raise FatalRowError(f"Ημερομηνία εκτός ορίων: {tgt.strftime('%d/%m/%Y')}")
+
+def date_input(page, selector):
+    # Το id μπορεί να είναι στο ίδιο το input ή στο p-calendar που το περιέχει
+    return page.locator(f"input{selector}, {selector} input").first
+
+def read_date_input(page, selector):
+    value = (date_input(page, selector).input_value() or "").strip()
+    for fmt in DATE_INPUT_FORMATS:
+        try:
+            d = datetime.strptime(value, fmt)
+            return d.day, d.month, d.year
+        except ValueError:
+            continue
+    return None
+
+def close_calendar(page):
+    try:
+        page.locator(".p-datepicker:visible").last.wait_for(state="hidden", timeout=2_000)
+    except Exception:
+        pass
+
+def set_date(page, selector, day, month, year):
+    target = (int(day), int(month), int(year))
+    check_date_bounds(*target)
+
+    # Γρήγορη διαδρομή 1: πληκτρολόγηση της ημερομηνίας στο πεδίο
+    if (selector, "type") not in _failed_date_paths:
+        if type_date(page, selector, *target) and read_date_input(page, selector) == target:
+            return
+        _failed_date_paths.add((selector, "type"))
+
+    # Γρήγορη διαδρομή 2: επιλογή έτους/μήνα από την κεφαλίδα του ημερολογίου
+    page.click(selector)
+    if (selector, "header") not in _failed_date_paths:
+        if pick_date_from_header(page, *target) and read_date_input(page, selector) == target:
+            return
+        _failed_date_paths.add((selector, "header"))
+
+    # Εφεδρική διαδρομή: μήνας-μήνας με τα βέλη, με επαλήθευση του αποτελέσματος
+    page.keyboard.press("Escape")
+    close_calendar(page)
+    page.click(selector)
+    pick_date_from_calendar(page, *target)
+    picked = read_date_input(page, selector)
+    if picked is None:
+        raise RuntimeError(f"Κενή ή μη αναγνώσιμη ημερομηνία στο {selector} μετά την επιλογή από το ημερολόγιο")
+    if picked != target:
+        raise RuntimeError(f"Λάθος ημερομηνία στο {selector}: {picked[0]}/{picked[1]}/{picked[2]}")
+
+def type_date(page, selector, day, month, year):
+    inp = date_input(page, selector)
+    try:
+        inp.fill(datetime(year, month, day).strftime(DATE_INPUT_FORMATS[0]), timeout=2_000)
+        inp.press("Tab")
+    except Exception:
+        # π.χ. readonlyInput: το πεδίο δεν δέχεται πληκτρολόγηση
+        return False
+    close_calendar(page)
+    return True
+
+def pick_date_from_header(page, day, month, year):
+    page.wait_for_selector(".p-datepicker:visible")
+    calendar = page.locator(".p-datepicker:visible").last
+    year_ctl = calendar.locator(".p-datepicker-year").first
+    month_ctl = calendar.locator(".p-datepicker-month").first
+    if year_ctl.count() == 0 or month_ctl.count() == 0:
+        return False
+
+    try:
+        if year_ctl.evaluate("el => el.tagName") == "SELECT":
+            # Παλαιότερο PrimeNG: yearNavigator/monthNavigator ως <select>
+            year_ctl.select_option(str(year))
+            month_ctl.select_option(index=month - 1)
+        else:
+            year_ctl.click()
+            years = calendar.locator(".p-yearpicker-year")
+            for _ in range(20):
+                shown = [int(t) for t in years.all_text_contents() if t.strip().isdigit()]
+                if not shown:
+                    return False
+                if min(shown) <= year <= max(shown):
+                    break
+                first = years.first.text_content().strip()
+                calendar.locator(".p-datepicker-next" if year > max(shown) else ".p-datepicker-prev").click()
+                wait_for_text_change(page, years.first, first)
+            else:
+                return False
+            years.filter(has_text=str(year)).first.click()
+            calendar.locator(".p-monthpicker-month").nth(month - 1).click()
+        click_day(calendar, day, month, year)
+    except Exception as e:
+        print(f"Η επιλογή έτους/μήνα απέτυχε ({e}) - χρήση ημερολογίου")
+        return False
+    return True
+
+def click_day(calendar, day, month, year):
+    day_cell = calendar.locator(f"td:not(.p-disabled):not(.p-datepicker-other-month) >> text={int(day)}").first
+    if day_cell.count() == 0:
+        raise FatalRowError(f"Δεν βρέθηκε ενεργή μέρα {day}/{month}/{year}")
+    
+    day_cell.click()
+    try:
+        calendar.wait_for(state="hidden", timeout=2_000)
+    except Exception:
+        pass
+
+def scrape_portal_documents(page):
+    # Ευρετήριο (ΑΦΜ, κωδ. δικαιολογητικού, όνομα αρχείου) -> [(κωδ. έργου, κατάσταση)] από τη λίστα της πύλης
+    if LIST_PATH not in page.url:
+        page.goto(LIST_URL)
+    page.wait_for_selector("text=Προσθήκη", state="visible")
+    wait_network_idle(page, SESSION_PROBE_TIMEOUT)
+
+    index = {}
+    columns = None
+    for _ in range(SCRAPE_MAX_PAGES):
+        # Όλη η σελίδα του πίνακα σε ένα evaluate αντί για ένα round-trip ανά κελί
+        data = page.evaluate('''() => {
+            const table = document.querySelector('.p-datatable table') || document.querySelector('table');
+            if (!table) return {headers: [], rows: []};
+            const text = el => (el.textContent || '').trim();
+            return {
+                headers: [...table.querySelectorAll('thead th')].map(text),
+                rows: [...table.querySelectorAll('tbody tr')].map(tr => [...tr.querySelectorAll('td')].map(text)),
+            };
+        }''')
+        if columns is None:
+            columns = portal_columns(data["headers"])
+            if columns is None:
+                print(f"Άγνωστες στήλες λίστας πύλης: {data['headers']}")
+                return None
+        for cells in data["rows"]:
+            if len(cells) <= max(v for v in columns.values() if v is not None):
+                continue  # π.χ. "Δεν βρέθηκαν εγγραφές"
+            key = portal_key(cells[columns["ben"]], cells[columns["doc"]], cells[columns["file"]])
+            status = cells[columns["status"]] if columns["status"] is not None else ""
+            index.setdefault(key, []).append((cells[columns["app"]].upper(), status))
+
+        next_btn = page.locator(".p-paginator-next").first
+        if next_btn.count() == 0 or not next_btn.is_enabled() or "p-disabled" in (next_btn.get_attribute("class") or ""):
+            break
+        first_row = page.locator("table tbody tr").first
+        old = (first_row.text_content() or "").strip()
+        next_btn.click()
+        wait_for_text_change(page, first_row, old)
+    print(f"Σάρωση πύλης: {sum(len(v) for v in index.values())} δικαιολογητικά")
+    return index
+
+def portal_columns(headers):
+    def find(*words):
+        for i, h in enumerate(headers):
+            if any(w in h for w in words):
+                return i
+        return None
+    columns = {"ben": find("Δικαιούχ", "ΑΦΜ"), "app": find("Έργ", "έργ"),
+               "doc": find("Δικαιολογητικ"), "file": find("Αρχεί", "αρχεί"),
+               "status": find("Κατάσταση")}
+    if None in (columns["ben"], columns["app"], columns["doc"], columns["file"]):
+        return None
+    return columns
+
+def portal_key(ben, doc, fname):
+    afm = re.search(r'\d{9}', ben)
+    code = re.search(r'\d{2}\.\d{2}', doc)
+    return (afm.group(0) if afm else ben.strip().upper(),
+            code.group(0) if code else doc.strip(),
+            os.path.splitext(os.path.basename(fname.strip()))[0].lower())
+
+def portal_lookup(index, row):
+    # Επιστρέφει την κατάσταση της εγγραφής της πύλης για τη γραμμή, ή None αν δεν υπάρχει
+    key = portal_key(str(row["Επωνυμία – ΑΦΜ"]), str(row["Κωδικός Δικαιολογητικού"]), str(row["Όνομα αρχείου"]))
+    app = str(row["Κωδικός έργου"]).strip().upper()
+    if not app:
+        return None
+    # Ολόκληρος κωδικός: το ΕΡΓΟ-100 δεν ταιριάζει με ΕΡΓΟ-1004 ή ΕΡΓΟ-100-Α
+    code = re.compile(rf"(?<![\w-]){re.escape(app)}(?!\w|-\w)")
+    for project, status in index.get(key, []):
+        if code.search(project):
+            return status
+    return None
+
+def pick_date_from_calendar(page, day, month, year):
+    page.wait_for_selector(".p-datepicker:visible")
+    calendar = page.locator(".p-datepicker:visible").last
+    
+    check_date_bounds(day, month, year)
+    tgt = datetime(year=year, month=month, day=1)
+    
+    month_map = {"Ιανουάριος": 1, "Φεβρουάριος": 2, "Μάρτιος": 3, "Απρίλιος": 4,
+                 "Μάιος": 5, "Ιούνιος": 6, "Ιούλιος": 7, "Αύγουστος": 8,
+                 "Σεπτέμβριος": 9, "Οκτώβριος": 10, "Νοέμβριος": 11, "Δεκέμβριος": 12}
+    
+    title = calendar.locator(".p-datepicker-title")
+    while True:
+        hdr_text = (title.text_content() or "").strip()
+        hdr = hdr_text.split()
+        if len(hdr) < 2:
+            wait_for_text_change(page, title, hdr_text)
+            continue
+
+        c_y, c_m = int(hdr[1]), month_map[hdr[0]]
+        
+        if c_y == year and c_m == month:
+            break
+        
+        if tgt > datetime(year=c_y, month=c_m, day=1):
+            calendar.locator(".p-datepicker-next").click()
+        else:
+            calendar.locator(".p-datepicker-prev").click()
+        wait_for_text_change(page, title, hdr_text)
+    
+    click_day(calendar, day, month, year)
+
+def excel_date_to_parts(val):
+    if pd.isna(val):
+        today = datetime.today()
+        return today.day, today.month, today.year
+    if isinstance(val, (int, float)):
+        d = datetime(1899, 12, 30) + timedelta(days=int(val))
+    else:
+        d = pd.to_datetime(val)
+    return d.day, d.month, d.year
+
+# -------------------------- CLI --------------------------
+def console_printer(out):
+    def on_event(kind, data):
+        if kind == "progress":
+            print(f"Πρόοδος: {data['current']}/{data['total']}", file=out)
+        elif kind == "result":
+            mark = "✓" if data["ok"] else "✗"
+            print(f"{mark} {data['name']}" + (f": {data['reason']}" if data["reason"] else ""), file=out)
+        elif kind == "check" and not data["ok"]:
+            print(f"{data['status']} {data['name']}: {data['reason']}", file=out)
+        elif kind == "skipped":
+            print(f"ℹ {data['name']}: {data['reason']}", file=out)
+        elif kind == "health":
+            print(health_text(data), file=out)
+        elif kind in ("info", "check_done"):
+            print(data["text"], file=out)
+        elif kind == "error":
+            print(f"{data['title']}: {data['text']}", file=out)
+        out.flush()
+    return on_event
+
+def json_printer(out):
+    def on_event(kind, data):
+        out.write(json.dumps({"event": kind, "ts": datetime.now().isoformat(timespec="seconds"), **data},
+                             ensure_ascii=False, default=str) + "\n")
+        out.flush()
+    return on_event
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OPSKE Agent: έλεγχος και upload δικαιολογητικών χωρίς GUI")
+    parser.add_argument("--excel", required=True, help="αρχείο Excel με τις γραμμές")
+    parser.add_argument("--folder", required=True, help="φάκελος με τα αρχεία")
+    parser.add_argument("--mode", choices=("save", "submit"), default="save", help="αποθήκευση ή υποβολή")
+    parser.add_argument("--headless", action="store_true", help="Chromium χωρίς παράθυρο και χωρίς slow_mo")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"παράλληλα browser contexts (1-{MAX_WORKERS})")
+    parser.add_argument("--pacing", choices=list(PACING_PROFILES), default=DEFAULT_PACING, help="προφίλ ρυθμού")
+    parser.add_argument("--compress", action="store_true", help=f"συμπίεση αρχείων άνω των {COMPRESS_MIN_MB} MB πριν το upload (Pillow/pikepdf)")
+    parser.add_argument("--retries", type=int, default=RETRY_ATTEMPTS, help="προσπάθειες ανά γραμμή σε παροδικά σφάλματα")
+    parser.add_argument("--assets", choices=ASSET_MODES, default=DEFAULT_ASSET_MODE,
+                        help="στατικά αρχεία πύλης: off, block (εικόνες/fonts) ή cache (από τον δίσκο)")
+    parser.add_argument("--pipeline", action="store_true", help="δεύτερη καρτέλα ανά worker: η επόμενη φόρμα ανοίγει όσο αποθηκεύεται η τρέχουσα")
+    parser.add_argument("--evidence", choices=EVIDENCE_MODES, default=DEFAULT_EVIDENCE,
+                        help="αποδεικτικό μετά την υποβολή: screenshot (JPEG φόρμας), html (gzip) ή off")
+    parser.add_argument("--account", default=DEFAULT_ACCOUNT,
+                        help="λογαριασμός ΑΑΔΕ (στοιχεία από OPSKE_USER_<ΟΝΟΜΑ>/OPSKE_PASS_<ΟΝΟΜΑ>)")
+    parser.add_argument("--dry-run", action="store_true", help="μόνο η σειρά επεξεργασίας και εκτίμηση διάρκειας, χωρίς browser")
+    parser.add_argument("--json", action="store_true", help="γεγονότα προόδου ως JSON lines στο stdout")
+    args = parser.parse_args(argv)
+
+    engine = UploadEngine(args.excel, args.folder, workers=args.workers, pacing=args.pacing, headless=args.headless,
+                          compress=args.compress, dry_run=args.dry_run, retries=max(1, args.retries), assets=args.assets,
+                          pipeline=args.pipeline, account=args.account,
+                          evidence=args.evidence)
+    out = sys.stdout
+    engine.subscribe(json_printer(out) if args.json else console_printer(out))
+
+    # Σε λειτουργία JSON τα διαγνωστικά μηνύματα πηγαίνουν στο stderr για να μένει καθαρό το stdout
+    with redirect_stdout(sys.stderr if args.json else sys.stdout):
+        if not engine.check():
+            return 1
+        try:
+            engine.execute(submit=args.mode == "submit")
+        except Exception as e:
+            engine.emit("error", title="Σφάλμα", text=str(e))
+            return 1
+    return 2 if engine.failed_rows() else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+import os
+import sys
+import json
+import queue
+import shutil
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+from opske_core import (UploadEngine, console_printer, PROFILE_DIR, PACING_PROFILES, DEFAULT_PACING,
+                        DEFAULT_WORKERS, MAX_WORKERS, RETRY_ATTEMPTS, ASSET_MODES, DEFAULT_ASSET_MODE,
+                        DEFAULT_ACCOUNT, EVIDENCE_MODES, DEFAULT_EVIDENCE, SCREEN_DIR, EVIDENCE_MAX_MB)
+
+# -------------------------- ΡΥΘΜΙΣΕΙΣ --------------------------
+# Ουρά εργασιών (ένα workbook + φάκελος ανά εργασία) σε τοπική βάση SQLite
+JOBS_DB = os.environ.get("OPSKE_JOBS_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "opske_jobs.db"))
+# Συνολικά browser contexts για όλες τις εργασίες που τρέχουν ταυτόχρονα
+DEFAULT_BUDGET = 4
+POLL_SECONDS = 2
+JOB_STATUSES = ("pending", "running", "done", "partial", "failed", "cancelled")
+# Ρυθμίσεις του UploadEngine που αποθηκεύονται ανά εργασία
+JOB_OPTIONS = ("pacing", "compress", "retries", "assets", "pipeline", "evidence")
+# Αποδεικτικά ανά εργασία στο SCREEN_DIR/job_<id>. Ένα όριο για όλα (ρίζα + φάκελοι εργασιών):
+# κάθε εργασία που τρέχει παίρνει μερίδιο του EVIDENCE_MAX_MB ανάλογο με τα contexts της και οι φάκελοι
+# των εργασιών που έχουν τελειώσει διαγράφονται από τον λιγότερο πρόσφατα χρησιμοποιημένο
+JOB_EVIDENCE_PREFIX = "job_"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    excel    TEXT NOT NULL,
+    folder   TEXT NOT NULL,
+    mode     TEXT NOT NULL DEFAULT 'save',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status   TEXT NOT NULL DEFAULT 'pending',
+    account  TEXT NOT NULL DEFAULT '',
+    workers  INTEGER NOT NULL DEFAULT 1,
+    options  TEXT NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    message  TEXT NOT NULL DEFAULT '',
+    created  TEXT NOT NULL,
+    started  TEXT,
+    finished TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority DESC, id);
+"""
+
+
+def now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def job_evidence_dir(job_id, root=SCREEN_DIR):
+    return os.path.join(root, f"{JOB_EVIDENCE_PREFIX}{job_id}")
+
+
+def folder_usage(path):
+    # (bytes, πιο πρόσφατο mtime) των αρχείων του φακέλου· οι υποφάκελοι μετρούν χωριστά
+    size, latest = 0, 0.0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            st = entry.stat()
+            size += st.st_size
+            latest = max(latest, st.st_mtime)
+    return size, latest
+
+
+def prune_job_evidence(keep=(), root=SCREEN_DIR, max_mb=EVIDENCE_MAX_MB):
+    # Διαγραφή ολόκληρων φακέλων job_<id> (όχι όσων είναι στο keep) μέχρι το σύνολο να χωρά στο όριο
+    if not os.path.isdir(root):
+        return 0
+    total = folder_usage(root)[0]
+    folders = []
+    for entry in os.scandir(root):
+        suffix = entry.name[len(JOB_EVIDENCE_PREFIX):]
+        if not (entry.is_dir() and entry.name.startswith(JOB_EVIDENCE_PREFIX) and suffix.isdigit()):
+            continue
+        size, latest = folder_usage(entry.path)
+        total += size
+        if int(suffix) not in keep:
+            folders.append((latest, size, entry.path))
+    removed = 0
+    for _, size, path in sorted(folders):
+        if total <= max_mb * 1048576:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+class JobStore:
+    # Μία σύνδεση ανά διεργασία· οι αλλαγές είναι σύντομες συναλλαγές κάτω από lock,
+    # ώστε GUI, CLI και scheduler να μοιράζονται το ίδιο αρχείο
+    def __init__(self, path=JOBS_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def execute(self, sql, params=()):
+        with self.lock, self.db:
+            return self.db.execute(sql, params)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.db.execute(sql, params)]
+
+    def add(self, excel, folder, mode="save", priority=0, account=DEFAULT_ACCOUNT, workers=DEFAULT_WORKERS, **options):
+        if mode not in ("save", "submit"):
+            raise ValueError(f"Άγνωστη λειτουργία: {mode}")
+        unknown = set(options) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"Άγνωστες ρυθμίσεις: {', '.join(sorted(unknown))}")
+        cur = self.execute(
+            "INSERT INTO jobs (excel, folder, mode, priority, account, workers, options, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(excel), os.path.abspath(folder), mode, priority, account,
+             max(1, min(MAX_WORKERS, workers)), json.dumps(options, ensure_ascii=False), now()))
+        return cur.lastrowid
+
+    def get(self, job_id):
+        rows = self.query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def list(self, status=None):
+        if status:
+            return self.query("SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, id", (status,))
+        return self.query("SELECT * FROM jobs ORDER BY id")
+
+    def pending(self):
+        return self.list("pending")
+
+    def start(self, job_id):
+        # Ατομική μετάβαση pending -> running: αν άλλος scheduler την πήρε πρώτος, επιστρέφει False
+        cur = self.execute("UPDATE jobs SET status = 'running', started = ?, attempts = attempts + 1 "
+                           "WHERE id = ? AND status = 'pending'", (now(), job_id))
+        return cur.rowcount == 1
+
+    def finish(self, job_id, status, message=""):
+        self.execute("UPDATE jobs SET status = ?, message = ?, finished = ? WHERE id = ?",
+                     (status, message, now(), job_id))
+
+    def cancel(self, job_id):
+        cur = self.execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'pending'",
+                           (now(), job_id))
+        return cur.rowcount == 1
+
+    def retry(self, job_id):
+        cur = self.execute("UPDATE jobs SET status = 'pending', message = '', finished = NULL "
+                           "WHERE id = ? AND status IN ('partial', 'failed', 'cancelled')", (job_id,))
+        return cur.rowcount == 1
+
+    def requeue_interrupted(self):
+        # Εργασίες που έμειναν "running" από διακοπή ξαναμπαίνουν στην ουρά· το journal κάθε
+        # workbook εξασφαλίζει ότι οι γραμμές που είχαν ολοκληρωθεί δεν ξανανεβαίνουν
+        cur = self.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+        return cur.rowcount
+
+
+class JobScheduler:
+    # Τρέχει εργασίες παράλληλα (ένα thread και ένα UploadEngine ανά εργασία) χωρίς να ξεπερνά
+    # το συνολικό budget από browser contexts. Εργασίες του ίδιου λογαριασμού ΑΑΔΕ μοιράζονται
+    # την αποθηκευμένη συνεδρία του (ένα login τη φορά ανά λογαριασμό, βλ. opske_core.open_session).
+    def __init__(self, store, budget=DEFAULT_BUDGET, headless=False, log_dir=PROFILE_DIR, evidence_root=SCREEN_DIR):
+        self.store = store
+        self.budget = max(1, budget)
+        self.headless = headless
+        self.log_dir = log_dir
+        self.evidence_root = evidence_root
+        self.running = {}  # id -> (workers, excel)
+        self.finished = {}  # id -> κατάσταση, για τις εργασίες αυτής της εκτέλεσης
+        self.done = queue.Queue()
+        os.makedirs(log_dir, exist_ok=True)
+
+    def free(self):
+        return self.budget - sum(workers for workers, _ in self.running.values())
+
+    def pick(self):
+        # Η εργασία με τη μεγαλύτερη προτεραιότητα που δεν γράφει σε workbook που ήδη επεξεργάζεται
+        busy = {excel for _, excel in self.running.values()}
+        for job in self.store.pending():
+            if job["excel"] not in busy:
+                return job
+        return None
+
+    def prune_evidence(self):
+        # Οι φάκελοι εργασιών που τρέχουν (εδώ ή σε άλλον scheduler) δεν αγγίζονται
+        keep = set(self.running) | {job["id"] for job in self.store.list("running")}
+        removed = prune_job_evidence(keep, self.evidence_root)
+        if removed:
+            print(f"Αποδεικτικά: διαγράφηκαν οι φάκελοι {removed} παλαιότερων εργασιών (όριο {EVIDENCE_MAX_MB} MB)")
+
+    def run(self, watch=False):
+        resumed = self.store.requeue_interrupted()
+        if resumed:
+            print(f"Συνέχιση {resumed} εργασιών που είχαν διακοπεί")
+        self.prune_evidence()
+        while True:
+            while self.free() > 0:
+                job = self.pick()
+                if job is None or not self.store.start(job["id"]):
+                    break
+                workers = min(job["workers"], self.free())
+                self.running[job["id"]] = (workers, job["excel"])
+                print(f"▶ Εργασία #{job['id']}: {os.path.basename(job['excel'])} ({job['mode']}, workers={workers})")
+                threading.Thread(target=self.run_job, args=(job, workers), name=f"job-{job['id']}", daemon=True).start()
+
+            if not self.running and not watch and self.pick() is None:
+                break
+            try:
+                job_id, status, message = self.done.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+            self.running.pop(job_id, None)
+            self.finished[job_id] = status
+            print(f"■ Εργασία #{job_id}: {status}" + (f" - {message}" if message else ""))
+            self.prune_evidence()
+
+    def run_job(self, job, workers):
+        status, message = "failed", ""
+        try:
+            status, message = self.execute_job(job, workers)
+        except Exception as e:
+            message = str(e)
+        finally:
+            self.store.finish(job["id"], status, message)
+            self.done.put((job["id"], status, message))
+
+    def execute_job(self, job, workers):
+        options = json.loads(job["options"] or "{}")
+        engine = UploadEngine(job["excel"], job["folder"], workers=workers,
+                              pacing=options.get("pacing", DEFAULT_PACING), headless=self.headless,
+                              compress=options.get("compress", False), retries=options.get("retries", RETRY_ATTEMPTS),
+                              assets=options.get("assets", DEFAULT_ASSET_MODE), pipeline=options.get("pipeline", False),
+                              account=job["account"], evidence=options.get("evidence", DEFAULT_EVIDENCE),
+                              evidence_dir=job_evidence_dir(job["id"], self.evidence_root),
+                              evidence_mb=max(1, EVIDENCE_MAX_MB * workers // self.budget))
+        log_path = os.path.join(self.log_dir, f"job_{job['id']}.log")
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(f"--- {now()} προσπάθεια {job['attempts'] + 1} ---\n")
+            engine.subscribe(console_printer(log))
+            if not engine.check():
+                return "failed", f"Ο έλεγχος βρήκε σφάλματα (βλ. {log_path})"
+            engine.execute(submit=job["mode"] == "submit")
+        failed = engine.failed_rows()
+        if failed:
+            return "partial", f"{len(failed)} γραμμές απέτυχαν (βλ. {log_path})"
+        return "done", ""
+
+
+# -------------------------- CLI --------------------------
+def print_jobs(jobs):
+    print(f"{'#':>4} {'κατάσταση':<10} {'προτ.':>5} {'λειτ.':<6} {'λογαριασμός':<12} Excel")
+    for job in jobs:
+        print(f"{job['id']:>4} {job['status']:<10} {job['priority']:>5} {job['mode']:<6} "
+              f"{job['account'] or '-':<12} {job['excel']}" + (f"\n{'':>6}{job['message']}" if job["message"] else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OPSKE Agent: ουρά εργασιών για πολλά workbooks")
+    parser.add_argument("--db", default=JOBS_DB, help="αρχείο SQLite της ουράς")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="νέα εργασία στην ουρά")
+    add.add_argument("--excel", required=True)
+    add.add_argument("--folder", required=True)
+    add.add_argument("--mode", choices=("save", "submit"), default="save")
+    add.add_argument("--priority", type=int, default=0, help="μεγαλύτερη τιμή = νωρίτερα")
+    add.add_argument("--account", default=DEFAULT_ACCOUNT, help="λογαριασμός ΑΑΔΕ (OPSKE_USER_<ΟΝΟΜΑ>/OPSKE_PASS_<ΟΝΟΜΑ>)")
+    add.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"μέγιστα contexts της εργασίας (1-{MAX_WORKERS})")
+    add.add_argument("--pacing", choices=list(PACING_PROFILES), default=DEFAULT_PACING)
+    add.add_argument("--compress", action="store_true")
+    add.add_argument("--retries", type=int, default=RETRY_ATTEMPTS)
+    add.add_argument("--assets", choices=ASSET_MODES, default=DEFAULT_ASSET_MODE)
+    add.add_argument("--pipeline", action="store_true")
+    add.add_argument("--evidence", choices=EVIDENCE_MODES, default=DEFAULT_EVIDENCE)
+
+    lst = commands.add_parser("list", help="εμφάνιση εργασιών")
+    lst.add_argument("--status", choices=JOB_STATUSES)
+
+    run = commands.add_parser("run", help="εκτέλεση της ουράς")
+    run.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="συνολικά browser contexts")
+    run.add_argument("--headless", action="store_true")
+    run.add_argument("--watch", action="store_true", help="αναμονή για νέες εργασίες αντί για τερματισμό")
+
+    for name, text in (("cancel", "ακύρωση εργασίας σε αναμονή"), ("retry", "επανάληψη αποτυχημένης εργασίας")):
+        commands.add_parser(name, help=text).add_argument("id", type=int)
+
+    args = parser.parse_args(argv)
+    store = JobStore(args.db)
+    try:
+        if args.command == "add":
+            if not os.path.isfile(args.excel) or not os.path.isdir(args.folder):
+                print("Δεν βρέθηκε το Excel ή ο φάκελος", file=sys.stderr)
+                return 1
+            job_id = store.add(args.excel, args.folder, args.mode, args.priority, args.account, args.workers,
+                               pacing=args.pacing, compress=args.compress, retries=max(1, args.retries),
+                               assets=args.assets, pipeline=args.pipeline, evidence=args.evidence)
+            print(f"Εργασία #{job_id} στην ουρά")
+        elif args.command == "list":
+            print_jobs(store.list(args.status))
+        elif args.command == "run":
+            scheduler = JobScheduler(store, args.budget, args.headless)
+            scheduler.run(watch=args.watch)
+            return 2 if set(scheduler.finished.values()) & {"partial", "failed"} else 0
+        elif args.command in ("cancel", "retry"):
+            changed = (store.cancel if args.command == "cancel" else store.retry)(args.id)
+            if not changed:
+                print(f"Η εργασία #{args.id} δεν βρίσκεται σε κατάσταση που το επιτρέπει", file=sys.stderr)
+                return 1
+            print(f"Εργασία #{args.id}: {store.get(args.id)['status']}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
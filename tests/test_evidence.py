@@ -0,0 +1,94 @@
+# EvidenceWriter: αποφυγή διπλοτύπων, διαγραφή των λιγότερο πρόσφατα χρησιμοποιημένων
+# πάνω από το όριο και συμπύκνωση του index.jsonl
+import os
+import sys
+import gzip
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opske_core
+from opske_core import EvidenceWriter, EVIDENCE_INDEX
+
+KB = 1024
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Ψεύτικο ρολόι: κάθε εγγραφή έχει διαφορετικό, αύξοντα χρόνο ώστε η σειρά LRU να είναι σαφής
+    now = [1_000_000.0]
+
+    def tick():
+        now[0] += 10
+        return now[0]
+    monkeypatch.setattr(opske_core.time, "time", tick)
+
+
+def write_all(directory, items, max_mb=1):
+    writer = EvidenceWriter(str(directory), max_mb=max_mb)
+    for key, kind, data in items:
+        writer.put(key, kind, data)
+    writer.close()
+    return writer
+
+
+def index(directory):
+    with open(os.path.join(directory, EVIDENCE_INDEX), encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+def test_duplicate_is_only_indexed(tmp_path, clock):
+    data = os.urandom(10 * KB)
+    writer = write_all(tmp_path, [("a", "screenshot", data), ("b", "screenshot", data)])
+    assert sorted(os.listdir(tmp_path)) == ["a.jpg", EVIDENCE_INDEX]
+    assert [(r["key"], r["file"], r.get("duplicate", False)) for r in index(tmp_path)] == \
+        [("a", "a.jpg", False), ("b", "a.jpg", True)]
+    assert writer.stats["written"] == 1 and writer.stats["duplicates"] == 1
+
+
+def test_html_is_gzipped(tmp_path, clock):
+    html = "<form>Υποβλήθηκε</form>".encode()
+    write_all(tmp_path, [("a", "html", html)])
+    with gzip.open(tmp_path / "a.html.gz") as fh:
+        assert fh.read() == html
+
+
+def test_prune_removes_least_recently_used(tmp_path, clock):
+    shared = os.urandom(400 * KB)
+    write_all(tmp_path, [
+        ("a", "screenshot", shared),
+        ("b", "screenshot", os.urandom(400 * KB)),
+        ("a2", "screenshot", shared),              # το a.jpg ξαναχρησιμοποιείται
+        ("c", "screenshot", os.urandom(400 * KB)),  # πάνω από 1 MB: φεύγει το b, όχι το a
+    ])
+    assert sorted(os.listdir(tmp_path)) == ["a.jpg", "c.jpg", EVIDENCE_INDEX]
+
+
+def test_index_drops_pruned_files(tmp_path, clock):
+    write_all(tmp_path, [(key, "screenshot", os.urandom(300 * KB)) for key in "abcde"])
+    files = set(os.listdir(tmp_path)) - {EVIDENCE_INDEX}
+    records = index(tmp_path)
+    assert {r["file"] for r in records} == files
+    assert len(records) == len(files) < 5
+
+
+def test_reload_keeps_dedup_and_size(tmp_path, clock):
+    data = os.urandom(50 * KB)
+    write_all(tmp_path, [("a", "screenshot", data)])
+    writer = write_all(tmp_path, [("b", "screenshot", data)])
+    assert writer.total == 50 * KB
+    assert writer.stats["duplicates"] == 1
+    assert index(tmp_path)[-1]["file"] == "a.jpg"
+
+
+def test_reload_ignores_subfolders_and_stale_records(tmp_path, clock):
+    os.makedirs(tmp_path / "job_1")
+    (tmp_path / "job_1" / "x.jpg").write_bytes(b"x" * KB)
+    data = os.urandom(KB)
+    write_all(tmp_path, [("a", "screenshot", data)])
+    os.remove(tmp_path / "a.jpg")
+    writer = write_all(tmp_path, [("b", "screenshot", data)])
+    assert writer.total == KB
+    assert writer.stats["duplicates"] == 0
+    assert sorted(os.listdir(tmp_path)) == ["b.jpg", EVIDENCE_INDEX, "job_1"]
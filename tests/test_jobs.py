@@ -0,0 +1,135 @@
+# Ουρά εργασιών: μεταβάσεις κατάστασης στο SQLite, επαναφορά διακοπτόμενων εργασιών,
+# scheduler με budget από contexts και όριο αποδεικτικών για όλους τους φακέλους εργασιών
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opske_jobs import JobStore, JobScheduler, job_evidence_dir, prune_job_evidence
+
+MB = 1048576
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "a.xlsx").write_bytes(b"")
+    (tmp_path / "docs").mkdir()
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def add(store, tmp_path, excel="a.xlsx", **kwargs):
+    return store.add(str(tmp_path / excel), str(tmp_path / "docs"), **kwargs)
+
+
+def test_add_normalises_and_validates(store, tmp_path):
+    job = store.get(add(store, tmp_path, workers=99, pacing="safe"))
+    assert job["status"] == "pending" and job["workers"] == 8 and job["attempts"] == 0
+    assert os.path.isabs(job["excel"])
+    with pytest.raises(ValueError):
+        add(store, tmp_path, mode="delete")
+    with pytest.raises(ValueError):
+        add(store, tmp_path, colour="red")
+
+
+def test_pending_order_by_priority_then_id(store, tmp_path):
+    low = add(store, tmp_path)
+    high = add(store, tmp_path, priority=5)
+    low2 = add(store, tmp_path)
+    assert [job["id"] for job in store.pending()] == [high, low, low2]
+
+
+def test_start_is_atomic(store, tmp_path):
+    job_id = add(store, tmp_path)
+    assert store.start(job_id)
+    assert not store.start(job_id)
+    job = store.get(job_id)
+    assert job["status"] == "running" and job["attempts"] == 1 and job["started"]
+
+
+def test_finish_retry_and_cancel(store, tmp_path):
+    job_id = add(store, tmp_path)
+    assert not store.retry(job_id)          # pending: τίποτα να επαναληφθεί
+    store.start(job_id)
+    assert not store.cancel(job_id)         # running: δεν ακυρώνεται
+    store.finish(job_id, "partial", "2 γραμμές απέτυχαν")
+    assert store.get(job_id)["message"] == "2 γραμμές απέτυχαν"
+    assert store.retry(job_id)
+    job = store.get(job_id)
+    assert job["status"] == "pending" and job["message"] == "" and job["finished"] is None
+    assert store.cancel(job_id)
+    assert store.get(job_id)["status"] == "cancelled"
+    assert store.retry(job_id)
+    store.start(job_id)
+    store.finish(job_id, "done")
+    assert not store.retry(job_id)          # done: τελική κατάσταση
+    assert store.get(job_id)["attempts"] == 2
+
+
+def test_requeue_interrupted_only_touches_running(store, tmp_path):
+    running, done, pending = (add(store, tmp_path) for _ in range(3))
+    store.start(running)
+    store.start(done)
+    store.finish(done, "done")
+    assert store.requeue_interrupted() == 1
+    assert [store.get(i)["status"] for i in (running, done, pending)] == ["pending", "done", "pending"]
+    assert store.start(running)
+    assert store.get(running)["attempts"] == 2
+
+
+class FakeScheduler(JobScheduler):
+    # Χωρίς browser: καταγράφει πόσα contexts χρησιμοποιούνται ταυτόχρονα
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.peak = 0
+        self.started = []
+
+    def execute_job(self, job, workers):
+        with self.lock:
+            self.started.append((job["id"], workers))
+            self.in_use += workers
+            self.peak = max(self.peak, self.in_use)
+        threading.Event().wait(0.05)
+        with self.lock:
+            self.in_use -= workers
+        if job["mode"] == "submit":
+            raise RuntimeError("αποτυχία")
+        return "done", ""
+
+
+def test_scheduler_respects_budget_and_workbook(store, tmp_path):
+    (tmp_path / "b.xlsx").write_bytes(b"")
+    first = add(store, tmp_path, workers=3, priority=2)
+    same_book = add(store, tmp_path, workers=1, priority=1)
+    other = add(store, tmp_path, excel="b.xlsx", workers=3)
+    failing = add(store, tmp_path, excel="b.xlsx", mode="submit")
+    scheduler = FakeScheduler(store, budget=4, log_dir=str(tmp_path / "logs"), evidence_root=str(tmp_path / "screenshots"))
+    scheduler.run()
+    assert scheduler.peak <= 4
+    assert dict(scheduler.started)[other] == 1  # μόνο ένα context έμενε ελεύθερο
+    assert scheduler.finished == {first: "done", same_book: "done", other: "done", failing: "failed"}
+    assert store.get(failing)["message"] == "αποτυχία"
+
+
+def fill(directory, size, mtime):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "x.jpg")
+    with open(path, "wb") as fh:
+        fh.write(b"\0" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_job_evidence_keeps_running_and_recent(tmp_path):
+    root = str(tmp_path)
+    fill(root, MB // 4, 500)  # αποδεικτικά GUI/CLI στη ρίζα: μετρούν αλλά δεν διαγράφονται
+    for job_id, mtime in ((1, 100), (2, 400), (3, 200), (4, 50)):
+        fill(job_evidence_dir(job_id, root), MB // 4, mtime)
+    os.makedirs(os.path.join(root, "job_x"))
+    assert prune_job_evidence(keep={4}, root=root, max_mb=1) == 1
+    assert sorted(os.listdir(root)) == ["job_2", "job_3", "job_4", "job_x", "x.jpg"]
+    assert prune_job_evidence(keep={4}, root=root, max_mb=1) == 0
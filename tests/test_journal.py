@@ -0,0 +1,91 @@
+# Ημερολόγιο κατάστασης: επαναφορά στο DataFrame, εγγραφή στο Excel και διατήρηση του
+# ημερολογίου όταν το workbook δεν γράφεται (π.χ. ανοιχτό στο Excel).
+import os
+import sys
+import json
+
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opske_core
+from opske_core import StatusJournal, journal_path, replay_journal, replay_into_workbook, STATUS_COLS
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    df = pd.DataFrame({"Όνομα αρχείου": ["a", "b", "c"], "Κωδικός έργου": ["ΕΡΓΟ-1", "ΕΡΓΟ-2", "ΕΡΓΟ-3"]})
+    for col in STATUS_COLS:
+        df[col] = ""
+    path = str(tmp_path / "clients.xlsx")
+    df.to_excel(path, index=False)
+    return path, df
+
+
+def write_journal(excel_path, records, tail=""):
+    with open(journal_path(excel_path), "w", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        fh.write(tail)
+
+
+def saved(row, fname, submitted="FALSE"):
+    return {"row": row, "fname": fname, "Αποθήκευση": "TRUE", "Υποβολή": submitted, "Ημ/νία & ώρα υποβολής": "01/01/2026 10:00:00"}
+
+
+def test_replay_applies_only_rows_with_the_same_file(workbook):
+    path, df = workbook
+    write_journal(path, [saved(0, "a"), saved(1, "άλλο"), saved(7, "z"), saved(2, "c", "TRUE")],
+                  tail='{"row": 1, "fna')  # μισογραμμένη τελευταία γραμμή
+    assert replay_journal(path, df) == 2
+    assert list(df["Αποθήκευση"]) == ["TRUE", "", "TRUE"]
+    assert list(df["Υποβολή"]) == ["FALSE", "", "TRUE"]
+
+
+def test_replay_without_journal(workbook):
+    path, df = workbook
+    assert replay_journal(path, df) == 0
+    assert replay_into_workbook(path, df) == 0
+
+
+def test_replay_writes_workbook_and_removes_journal(workbook):
+    path, df = workbook
+    write_journal(path, [saved(1, "b", "TRUE")])
+    assert replay_into_workbook(path, df) == 0
+    assert not os.path.exists(journal_path(path))
+    ws = openpyxl.load_workbook(path).worksheets[0]
+    header = {cell.value: cell.column for cell in ws[1]}
+    assert ws.cell(row=3, column=header["Αποθήκευση"]).value == "TRUE"
+    assert ws.cell(row=3, column=header["Υποβολή"]).value == "TRUE"
+    assert ws.cell(row=2, column=header["Αποθήκευση"]).value is None
+
+
+def test_locked_workbook_keeps_journal(workbook, monkeypatch):
+    path, df = workbook
+    write_journal(path, [saved(0, "a"), saved(2, "c")])
+
+    def locked(*args):
+        raise PermissionError("το αρχείο είναι ανοιχτό")
+    monkeypatch.setattr(opske_core, "write_status_columns", locked)
+
+    kept = replay_into_workbook(path, df)
+    assert kept == 2
+    assert os.path.exists(journal_path(path))
+    assert list(df["Αποθήκευση"]) == ["TRUE", "", "TRUE"]
+
+    # Η εκτέλεση συνεχίζει στο ίδιο ημερολόγιο: οι παλιές εγγραφές μετρούν ως εκκρεμείς και δεν χάνονται
+    journal = StatusJournal(path, pending=kept)
+    assert journal.append(1, "b", {"Αποθήκευση": "TRUE"}) == 3
+    journal.close()
+    with open(journal_path(path), encoding="utf-8") as fh:
+        assert [json.loads(line)["fname"] for line in fh] == ["a", "c", "b"]
+
+
+def test_empty_journal_is_removed_on_close(workbook):
+    path, _ = workbook
+    journal = StatusJournal(path)
+    journal.append(0, "a", {"Αποθήκευση": "TRUE"})
+    journal.truncate()
+    journal.close()
+    assert not os.path.exists(journal_path(path))
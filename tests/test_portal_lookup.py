@@ -0,0 +1,48 @@
+# Αντιστοίχιση γραμμών του Excel με εγγραφές της λίστας της πύλης (έλεγχος διπλοτύπων πριν το upload)
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opske_core import portal_key, portal_lookup
+
+BEN = "ΑΛΦΑ ΤΕΧΝΙΚΗ ΑΕ - 094019245"
+
+
+def row(app, ben=BEN, doc="01.03", fname="ενημεροτητα.pdf"):
+    return {"Επωνυμία – ΑΦΜ": ben, "Κωδικός Δικαιολογητικού": doc, "Όνομα αρχείου": fname, "Κωδικός έργου": app}
+
+
+def portal(*projects, status="Αποθηκευμένο"):
+    # Όπως το γεμίζει το scrape_portal_documents: κωδικός έργου σε κεφαλαία
+    key = portal_key("094019245", "01.03 Φορολογική ενημερότητα", "Ενημεροτητα.PDF")
+    return {key: [(project.upper(), status) for project in projects]}
+
+
+def test_key_ignores_name_extension_and_case():
+    assert portal_key(BEN, "01.03", "ενημεροτητα.pdf") == portal_key("094019245", "01.03 - Φορολογική", "Ενημεροτητα.PDF")
+
+
+@pytest.mark.parametrize("project", ["ΕΡΓΟ-100", "ΕΡΓΟ-100 (Επενδυτικό)", "ΕΡΓΟ-200, ΕΡΓΟ-100", "Κωδ. ΕΡΓΟ-100"])
+def test_exact_code_matches(project):
+    assert portal_lookup(portal(project, status="Υποβλήθηκε"), row("ΕΡΓΟ-100")) == "Υποβλήθηκε"
+
+
+@pytest.mark.parametrize("project", ["ΕΡΓΟ-1004", "ΕΡΓΟ-1000", "ΕΡΓΟ-100-Α", "ΝΕΟΕΡΓΟ-100", "Χ-ΕΡΓΟ-100"])
+def test_longer_codes_do_not_match(project):
+    assert portal_lookup(portal(project), row("ΕΡΓΟ-100")) is None
+
+
+def test_code_match_is_case_insensitive():
+    assert portal_lookup(portal("ΕΡΓΟ-100"), row("  εργο-100 ")) == "Αποθηκευμένο"
+
+
+def test_second_record_with_same_key():
+    assert portal_lookup(portal("ΕΡΓΟ-1004", "ΕΡΓΟ-100"), row("ΕΡΓΟ-100")) == "Αποθηκευμένο"
+
+
+def test_missing_project_or_other_document():
+    assert portal_lookup(portal("ΕΡΓΟ-100"), row("")) is None
+    assert portal_lookup(portal("ΕΡΓΟ-100"), row("ΕΡΓΟ-100", doc="01.04")) is None
+    assert portal_lookup(portal("ΕΡΓΟ-100"), row("ΕΡΓΟ-100", fname="άλλο.pdf")) is None
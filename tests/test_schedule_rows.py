@@ -0,0 +1,95 @@
+# Ομαδοποίηση γραμμών ανά δικαιούχο/έργο, μοίρασμα σε λωρίδες και κλοπή δουλειάς μεταξύ workers
+import os
+import sys
+import queue
+import threading
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opske_core import RowScheduler, interleave, row_groups, schedule_rows
+
+
+def frame(rows):
+    return pd.DataFrame([{"Επωνυμία – ΑΦΜ": ben, "Κωδικός έργου": app} for ben, app in rows])
+
+
+ROWS = [
+    ("ΑΛΦΑ - 111111111", "ΕΡΓΟ-1"),   # 0
+    ("ΒΗΤΑ - 222222222", "ΕΡΓΟ-5"),   # 1
+    ("ΑΛΦΑ - 111111111", "ΕΡΓΟ-2"),   # 2
+    ("ΑΛΦΑ ΑΕ 111111111", "εργο-1"),  # 3: ίδιο ΑΦΜ και έργο με την 0, άλλη γραφή
+    ("ΓΑΜΜΑ χωρίς ΑΦΜ", "ΕΡΓΟ-9"),    # 4
+    ("ΒΗΤΑ - 222222222", "ΕΡΓΟ-5"),   # 5
+    ("ΑΛΦΑ - 111111111", "ΕΡΓΟ-1"),   # 6
+]
+
+
+def test_groups_by_afm_and_project():
+    groups = row_groups(frame(ROWS))
+    assert groups[0] == groups[3] == groups[6] == ("111111111", "ΕΡΓΟ-1")
+    assert groups[4] == ("ΓΑΜΜΑ χωρίς ΑΦΜ".upper(), "ΕΡΓΟ-9")
+
+
+def test_single_lane_keeps_groups_together_in_first_seen_order():
+    assert schedule_rows(frame(ROWS), 1) == [[0, 3, 6, 2, 1, 5, 4]]
+
+
+def test_beneficiaries_stay_on_one_lane_biggest_first():
+    lanes = schedule_rows(frame(ROWS), 2)
+    assert lanes == [[0, 3, 6, 2], [1, 5, 4]]
+    assert sorted(interleave(lanes)) == list(range(len(ROWS)))
+    assert interleave(lanes)[:2] == [0, 1]
+
+
+def test_more_lanes_than_beneficiaries():
+    lanes = schedule_rows(frame(ROWS), 5)
+    assert len(lanes) == 5
+    assert sum(map(len, lanes)) == len(ROWS)
+    assert lanes.count([]) == 2
+
+
+def test_worker_takes_own_lane_from_the_front():
+    jobs = RowScheduler([[1, 2, 3], [4]])
+    assert jobs.get(0) == 1
+    assert jobs.get(1) == 4
+    assert jobs.qsize() == 2
+
+
+def test_empty_lane_steals_from_the_back_of_the_busiest():
+    jobs = RowScheduler([[1, 2, 3, 4], [5, 6], []])
+    assert jobs.get(2) == 4
+    assert jobs.get(2) == 3
+    assert jobs.get(1) == 5
+    assert jobs.get(1) == 6
+    assert jobs.get(1) == 2
+    assert jobs.get(0) == 1
+    with pytest.raises(queue.Empty):
+        jobs.get(0)
+    assert jobs.empty()
+
+
+def test_lane_index_wraps_and_no_lanes_is_empty():
+    assert RowScheduler([[1], [2]]).get(3) == 2
+    assert RowScheduler([]).empty()
+
+
+def test_concurrent_workers_take_every_row_once():
+    lanes = [list(range(i * 1000, i * 1000 + size)) for i, size in enumerate((900, 50, 0, 300))]
+    jobs = RowScheduler(lanes)
+    taken = [[] for _ in lanes]
+
+    def worker(lane):
+        while True:
+            try:
+                taken[lane].append(jobs.get(lane))
+            except queue.Empty:
+                return
+
+    threads = [threading.Thread(target=worker, args=(lane,)) for lane in range(len(lanes))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(sum(taken, [])) == sorted(sum(lanes, []))
@@ -0,0 +1,118 @@
+# set_date απέναντι σε τοπικό datepicker τύπου PrimeNG (tests/fixtures/datepicker.html):
+# πληκτρολόγηση, επιλογή έτους/μήνα από την κεφαλίδα (<select> και yearpicker) και
+# εφεδρικό περπάτημα μήνα-μήνα όταν η γρήγορη διαδρομή αποτυγχάνει ή δίνει λάθος ημερομηνία.
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opske_core
+from opske_core import set_date, read_date_input
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "datepicker.html")
+SELECTOR = "#issueDate"
+
+
+@pytest.fixture(scope="module")
+def browser():
+    from playwright.sync_api import sync_playwright
+    pw = sync_playwright().start()
+    try:
+        browser = pw.chromium.launch()
+    except Exception as e:
+        pw.stop()
+        pytest.skip(f"Chromium μη διαθέσιμο (playwright install chromium): {e}")
+    yield browser
+    browser.close()
+    pw.stop()
+
+
+@pytest.fixture
+def picker(browser):
+    def make(typing, header, days="fill"):
+        page = browser.new_page()
+        page.set_default_timeout(5_000)
+        with open(FIXTURE, encoding="utf-8") as fh:
+            page.set_content(fh.read())
+        page.evaluate("cfg => setup(cfg)", {"typing": typing, "header": header, "days": days})
+        pages.append(page)
+        return page
+
+    pages = []
+    opske_core._failed_date_paths.clear()
+    yield make
+    for page in pages:
+        page.close()
+    opske_core._failed_date_paths.clear()
+
+
+def parts(d):
+    return d.day, d.month, d.year
+
+
+def test_typed_path_skips_calendar(picker):
+    page = picker("accept", "none")
+    target = date.today() - timedelta(days=400)
+    set_date(page, SELECTOR, *parts(target))
+    assert read_date_input(page, SELECTOR) == parts(target)
+    assert page.evaluate("window.opened") == 0
+    assert not opske_core._failed_date_paths
+
+
+@pytest.mark.parametrize("header", ["select", "yearpicker"])
+def test_header_path_when_typing_is_rejected(picker, header):
+    page = picker("reject", header)
+    target = date(1998, 3, 17)  # άλλη δεκαετία: ο yearpicker πρέπει να μετακινηθεί
+    set_date(page, SELECTOR, *parts(target))
+    assert read_date_input(page, SELECTOR) == parts(target)
+    assert (SELECTOR, "type") in opske_core._failed_date_paths
+    assert (SELECTOR, "header") not in opske_core._failed_date_paths
+    assert page.evaluate("window.opened") == 1
+
+
+def test_header_path_with_readonly_input(picker):
+    page = picker("readonly", "yearpicker")
+    target = date(2031, 11, 30)
+    set_date(page, SELECTOR, *parts(target))
+    assert read_date_input(page, SELECTOR) == parts(target)
+    assert (SELECTOR, "type") in opske_core._failed_date_paths
+
+
+def test_month_walk_without_header_pickers(picker):
+    page = picker("reject", "none")
+    target = date.today() - timedelta(days=200)
+    set_date(page, SELECTOR, *parts(target))
+    assert read_date_input(page, SELECTOR) == parts(target)
+    assert {(SELECTOR, "type"), (SELECTOR, "header")} <= opske_core._failed_date_paths
+
+
+def test_wrong_header_result_falls_back_to_month_walk(picker):
+    # Η κεφαλίδα "πετυχαίνει" αλλά με λάθος μήνα: η επαλήθευση της τιμής στέλνει στο περπάτημα
+    page = picker("reject", "wrong-month")
+    target = date.today() - timedelta(days=300)
+    set_date(page, SELECTOR, *parts(target))
+    assert read_date_input(page, SELECTOR) == parts(target)
+    assert (SELECTOR, "header") in opske_core._failed_date_paths
+    assert page.evaluate("window.opened") == 2
+
+
+def test_failed_paths_are_not_retried(picker):
+    page = picker("reject", "none")
+    first = date.today() - timedelta(days=40)
+    set_date(page, SELECTOR, *parts(first))
+    typed = page.evaluate("window.typed")
+    assert typed > 0
+    second = date.today() - timedelta(days=70)
+    set_date(page, SELECTOR, *parts(second))
+    assert read_date_input(page, SELECTOR) == parts(second)
+    # Δεύτερη γραμμή: χωρίς νέα πληκτρολόγηση, κατευθείαν στο ημερολόγιο
+    assert page.evaluate("window.typed") == typed
+
+
+def test_empty_input_after_month_walk_fails(picker):
+    # Το ημερολόγιο κλείνει χωρίς τιμή: η γραμμή δεν πρέπει να αποθηκευτεί χωρίς ημερομηνία
+    page = picker("reject", "none", days="ignore")
+    with pytest.raises(RuntimeError, match="Κενή"):
+        set_date(page, SELECTOR, *parts(date.today() - timedelta(days=30)))